@@ -3,20 +3,25 @@ import json
 import os
 import sys
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import copy
 import numpy as np
 import re
 import base64
 from datetime import datetime
 import io
-from fpdf import FPDF
+import hashlib
+# plotly and fpdf are imported inside the chart/report functions, they are slow to
+# load and the manual-entry form does not need them until results are shown
 from utils.logs import setup_logger 
 from utils import calculate as calc
 from utils import doc_converter as dc
-from utils.general import STANDARDS, find_value, FIELD_MAPPINGS, get_status
+from utils import converter_pool
+from utils import decision as decision_rule
+from utils import jobs
+from utils import ratio_cache
+from utils import units
+from utils.general import STANDARDS, find_value, get_status
+from utils.mappings import get_field_mappings
 
 
 # Set page configuration
@@ -26,14 +31,27 @@ st.set_page_config(
     layout="wide"
 )
 
-ACCEPT_RATIO_PARAM = 6 # 6
-DESIRABLE_RATIO_PARAM = (ACCEPT_RATIO_PARAM/2) # 3
-REJECT_RATIO_PARAM = DESIRABLE_RATIO_PARAM # 3
+
+@st.cache_resource
+def start_converter_warmup():
+    """Warm the shared Docling converter pool once per server process."""
+    if converter_pool.WARMUP_ON_START:
+        return converter_pool.warm_up_in_background()
+    return None
+
+start_converter_warmup()
 
 APPROVED_GREEN = ":green[**GREEN : In principal approval subject to approve from concerned authority**]"
 CONSIDERABLE_AMBER= ":orange[**AMBER: In principal approval subject to aligning ratios (highlighted in red) to acceptable level.**]"
 REJECTED_RED = ":red[**RED: REJECTED**]"
 
+# The rule itself lives in utils.decision, shared with headless scoring (utils.scoring)
+DECISION_MESSAGES = {
+    decision_rule.GREEN: APPROVED_GREEN,
+    decision_rule.AMBER: CONSIDERABLE_AMBER,
+    decision_rule.RED: REJECTED_RED,
+}
+
 REJECTED = "REJECTED"
 APPROVED = "GREEN : In principal approval subject to approve from concerned authority"
 CONSIDERABLE = "AMBER: In principal approval subject to aligning ratios to acceptable level."
@@ -140,6 +158,8 @@ def display_metric(label, value, status, message, color):
 
 def create_multi_year_chart(years_data, ratio_name):
     """Create a chart showing a specific ratio across multiple years."""
+    import plotly.graph_objects as go
+
     # print(f"Creating chart for {ratio_name}..")
     years = list(years_data.keys())
     years.sort(key=dc.extract_year_from_key)
@@ -276,7 +296,7 @@ def perform_stress_test(data, stress_factors):
     for field, factor in stress_factors.items():
         # Get the original value using our mapping function
         original_value = None
-        for mapping_key, field_options in FIELD_MAPPINGS.items():
+        for mapping_key, field_options in get_field_mappings().items():
             if any(f.lower() == field.lower() for f in field_options):
                 original_value = find_value(data, field_options)
                 break
@@ -323,6 +343,8 @@ def perform_stress_test(data, stress_factors):
 
 def create_gauge_chart(ratio_name, original_value, stressed_value):
     """Create a gauge chart for stress test visualization using range-based standards."""
+    import plotly.graph_objects as go
+
     if pd.isna(original_value) or pd.isna(stressed_value):
         return None
     
@@ -747,7 +769,6 @@ def year_wise_financial_statements(all_years_data, years_ratios):
 
         num_columns = 3  # Display and adjust column numbers
         columns = st.columns(num_columns)
-        count_green, count_yellow, count_red = 0,0,0
 
         for i, (ratio_name, ratio_data) in enumerate(selected_ratios.items()):
             if ratio_name == 'EBITDA':
@@ -767,27 +788,14 @@ def year_wise_financial_statements(all_years_data, years_ratios):
                         ratio_data["message"],
                         ratio_data["color"]
                     )
-                    if selected_ratios[ratio_name]["color"] == "green":
-                        count_green += 1
-                    # if selected_ratios[ratio_name]["color"] == "yellow":
-                    #     count_yellow += 1
-                    # if selected_ratios[ratio_name]["color"] == "red":
-                    #     count_red += 1
-
-        if count_green: # or count_yellow or count_red:
-            # st.write(f"Green {count_green} - Red {count_red} - Yellow {count_yellow}")
-            if ACCEPT_RATIO_PARAM == 0:
+
+        if decision_rule.count_green(selected_ratios):
+            if decision_rule.ACCEPT_RATIO_PARAM == 0:
                 st.warning("**Overview: No financial ratios were calculated for the selected year.**")
             if selected_year == latest_audited or selected_year == first_projected:
-                if count_green >= ACCEPT_RATIO_PARAM: # 6
-                    decision_message = APPROVED_GREEN
-                    st.subheader(APPROVED_GREEN) 
-                if count_green == REJECT_RATIO_PARAM: # 3
-                    decision_message = CONSIDERABLE_AMBER
-                    st.subheader(CONSIDERABLE_AMBER) 
-                if count_green < REJECT_RATIO_PARAM: # 3
-                    decision_message = REJECTED_RED
-                    st.subheader(REJECTED_RED)
+                decision_message = DECISION_MESSAGES.get(decision_rule.decide(selected_ratios))
+                if decision_message:
+                    st.subheader(decision_message)
                 # else:
                 #     st.error("**Overview: No financial ratios were calculated for the selected year.**")
 
@@ -1095,6 +1103,8 @@ def audited_to_projected_trend(years_ratios):
                 trend_df = pd.DataFrame(trend_data)
                 
                 # Create a visualization for trend
+                import plotly.express as px
+
                 fig = px.bar(
                     trend_df,
                     x="Ratio/Calculation",
@@ -1181,21 +1191,6 @@ def audited_to_projected_trend(years_ratios):
     else:
         st.warning("No projected data available for loan recommendation.")
 
-# Value in '000
-def convert_to_thousands(all_years_data):
-    scaled_data = {}
-    
-    for year_key, data in all_years_data.items():
-        scaled_data[year_key] = {}
-        for key, value in data.items():
-            # Only scale numeric values
-            if isinstance(value, (int, float)):
-                scaled_data[year_key][key] = value * 1000
-            else:
-                scaled_data[year_key][key] = value
-
-    return scaled_data
-
 def edit_financial_data_for_year(year_key, financial_data):
     """
     Load and display financial data for a specific year/period for editing.
@@ -1916,6 +1911,9 @@ def print_doc(customer, year_selected, repayment_values, decision, years_ratios)
 
     datetime_now = datetime.now().strftime('%Y-%m-%d')
 
+    # fpdf is only needed when a report is printed
+    from fpdf import FPDF
+
     pdf = FPDF(orientation='P', unit='mm', format='A4')
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -1979,14 +1977,16 @@ def colored_section_header(self, text):
     # pdf.colored_section_header("Customer Information")
     
 
-def proceeding_steps(all_years_data, customer_data):
+def proceeding_steps(all_years_data, customer_data, scale=1):
 
     repayment_values = get_repayment_values(all_years_data.keys())
     
-    years_ratios = {}
-    for year_key, data in all_years_data.items():
-        year_repayment = repayment_values.get(year_key, 0)    # # Calculate DSCR with the specific repayment value
-        years_ratios[year_key] = calc.calculate_ratios_for_data(data, year_repayment) # TODO: CHECK EBITDA
+    # Every widget interaction reruns the script, only periods whose data, repayment or
+    # unit changed are recalculated. Values stay in statement units, scale only touches
+    # EBITDA and the DSCR repayment.
+    if "ratio_cache" not in st.session_state:
+        st.session_state.ratio_cache = ratio_cache.new_cache()
+    years_ratios = ratio_cache.get_years_ratios(st.session_state.ratio_cache, all_years_data, repayment_values, scale)
         
     # 1. Select Financial Statements to Analyze
     st.subheader("Select Financial Statements to Analyze")
@@ -2022,6 +2022,19 @@ def proceeding_steps(all_years_data, customer_data):
     with st.expander("Audited (recent) to Projected (upcoming)", expanded=False):
         audited_to_projected_trend(years_ratios)
 
+@st.fragment(run_every=1)
+def conversion_progress(job_id):
+    """Poll a background conversion job without blocking the rest of the page."""
+    job = jobs.get_status(job_id)
+    if job is None or job["status"] not in jobs.ACTIVE_STATES:
+        # Finished: rerun the whole app so the result is picked up
+        st.rerun()
+
+    st.progress(job["progress"], text=f"Extracting data: {job['message']}")
+    if st.button("Cancel extraction", key=f"cancel_{job_id}"):
+        jobs.cancel(job_id)
+        st.rerun()
+
 def main():
     st.subheader("Preliminary Loan Decision Making") 
     # initialize session state for financial data
@@ -2052,8 +2065,6 @@ def main():
         # if "proceed_inputdata" not in st.session_state:
         #     st.session_state["proceed_inputdata"] = False
         
-        # if "values_inthousands" not in st.session_state:
-        #     st.session_state["values_inthousands"] = False
 
         st.header("Upload Financial Data")
         uploaded_file = st.file_uploader("Upload a PDF file", type=["pdf"])
@@ -2068,21 +2079,35 @@ def main():
             # Extract file name without extension
             file_name = uploaded_file.name.split(".")[0]
 
-            # Convert BytesIO to Markdown
-            dc.pdf_to_md(file_bytes, file_name)
-
-            # Extract structured financial data as a dict
-            extracted_data = dc.extract_data_to_dict(file_name)
-
-            print(extracted_data)
-
-            # Save JSON file
-            dc.extract_dict_to_json(file_name)
+            # Convert BytesIO to structured financial data on a background worker.
+            # The job id is the content hash, so reruns attach to the same job.
+            job_id = hashlib.sha256(file_bytes.getvalue()).hexdigest()
+            jobs.submit(dc.pdf_to_data, file_bytes, file_name, job_id=job_id)
+            job = jobs.get_status(job_id)
+            job_status = job["status"]
+
+            extracted_data = None
+            if job["status"] == jobs.DONE and job["result"]:
+                extracted_data = job["result"]
+                st.success("File uploaded successfully!")
+                # The markdown is only rendered when someone asks to see it
+                if st.checkbox("Show extracted tables", key="show_extracted_tables"):
+                    st.markdown(dc.cached_markdown(file_bytes.getvalue()) or "No tables cached for this file.")
+            elif job["status"] in jobs.ACTIVE_STATES:
+                conversion_progress(job_id)
+            elif job["status"] == jobs.DONE:
+                # Converted, but no year header or standard field was found
+                st.error("No financial data was found in the uploaded PDF.")
+            else:
+                st.error(f"Extraction {job['status']}. {job['error'] or ''}")
+                if st.button("Retry extraction"):
+                    jobs.submit(dc.pdf_to_data, file_bytes, file_name, job_id=job_id, resubmit=True)
+                    st.rerun()
 
             st.session_state["uploaded_file"] = uploaded_file
             st.session_state["extracted_data"] = extracted_data
-            st.success("File uploaded successfully!")
         else:
+            job_status = None
             st.session_state["uploaded_file"] = None
             st.session_state["extracted_data"] = None
         
@@ -2095,27 +2120,36 @@ def main():
             help="Check this to proceed with the input of financial data"
         )
 
-        # Add checkbox for scaling values
-        values_in_thousands = st.checkbox(
-            "**Values in thousands: '000**", 
-            key="values_in_thousands",
-            help="Check this if the values in your JSON file are in thousands"
-        )
+        # Statement unit, detected from headers such as "Rs. in '000" and editable
+        scale = 1
+        if uploaded_file is not None and extracted_data is not None:
+            units_list = list(units.SCALES)
+            detected_unit = getattr(extracted_data, "unit", "Rupees")
+            statement_unit = st.selectbox(
+                "**Statement unit**",
+                units_list,
+                index=units_list.index(detected_unit),
+                key=f"statement_unit_{job_id}",
+                help="Detected from the statement headers, change it if the detection is wrong"
+            )
+            scale = units.SCALES[statement_unit]
 
         st.divider()
 
         if st.button("Reset All Data", type="primary", help="Reset all financial data"):
             st.session_state.financial_data = [{"current": {}}, {"projected": {}}]
             # st.session_state["proceed_inputdata"] = False
-            # st.session_state["values_inthousands"] = False
             st.session_state["input_expanded"] = False
             st.session_state["uploaded_file"] = None
             st.session_state["extracted_data"] = None
             st.rerun()
     
     
+    # Manual input also replaces an upload whose extraction failed or found nothing
+    extraction_failed = uploaded_file is not None and extracted_data is None and job_status not in jobs.ACTIVE_STATES
+
     all_years_data = {} # Final Dataset
-    if proceed_input_data and uploaded_file is None:
+    if proceed_input_data and (uploaded_file is None or extraction_failed):
         # -------------------- collect the data for the selected years
         # Financial Data Input Form
         customer_info = collect_customer_information()
@@ -2155,6 +2189,19 @@ def main():
         # else:
         #     st.error("**No financial data entered. Please enter the data in the form.**")
 
+    # No extracted data yet: keep the customer form editable while the job runs or after it failed
+    elif uploaded_file is not None and extracted_data is None:
+        collect_customer_information()
+        if not extraction_failed:
+            st.info("Financial data is being extracted from the uploaded PDF. You can fill in the customer details meanwhile.")
+        elif job_status == jobs.DONE:
+            st.error("No financial data was found in the uploaded PDF. "
+                     "Tick **Input Financial Data, proceed** in the sidebar to enter the data manually.")
+        else:
+            st.error(f"Extraction {job_status}, no financial data was extracted from the uploaded PDF. "
+                     "Use **Retry extraction** in the sidebar, or tick **Input Financial Data, proceed** "
+                     "to enter the data manually.")
+
     # Process uploaded file
     elif uploaded_file is not None:
         try:
@@ -2214,14 +2261,9 @@ def main():
 
             st.divider()
             
-            # If len(all_years_data)
-            if values_in_thousands:
-                all_years_data = convert_to_thousands(all_years_data)
-                # st.info("Values have been multiplied by 1,000 as specified.")
-
             # print("All Years Data:", all_years_data)
 
-            proceeding_steps(all_years_data, customer_info)
+            proceeding_steps(all_years_data, customer_info, scale)
                 
         except Exception as e:
             st.error(f"An error occurred: {e}") # TODO
@@ -0,0 +1,160 @@
+"""
+Extraction throughput per stage on a synthetic statement corpus, plus an opt-in suite
+over real Docling conversions of generated PDFs.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction [--docs 200] [--rows 40] [--years 4]
+    python -m benchmarks.bench_extraction --docling [--pdf-docs 5]
+
+Each stage reports rows/sec, docs/sec and the peak Python memory it allocated
+(tracemalloc). The Docling suite reports the peak RSS of the process instead, since
+most of Docling's memory lives outside the Python allocator.
+"""
+import argparse
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generated_mappings, make_corpus, tables_to_markdown
+from utils import doc_converter as dc
+from utils import layout_cache
+from utils.alias_matcher import match_label
+from utils.mappings import get_alias_matcher
+from utils.values import parse_values
+
+
+def measure(func):
+    """Run func once under tracemalloc, returning (seconds, peak bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def report(stage, seconds, peak, rows, docs):
+    print(f"{stage:<34} {rows / seconds:>12,.0f} {docs / seconds:>10,.1f} {peak / 2**20:>10.1f}")
+
+
+def run(docs, rows, years, noise):
+    corpus = make_corpus(docs, rows=rows, years=years, noise=noise)
+    markdowns = [tables_to_markdown(tables) for tables in corpus]
+    row_count = sum(len(table) for tables in corpus for table in tables)
+    labels = [row[0].strip().lower() for tables in corpus for table in tables for row in table]
+    cells = [cell for tables in corpus for table in tables for row in table[2:] for cell in row[1:]]
+    matcher = get_alias_matcher()
+
+    print(f"{docs} documents, {row_count:,} rows, {len(cells):,} value cells")
+    print(f"{'stage':<34} {'rows/s':>12} {'docs/s':>10} {'peak MB':>10}")
+
+    lines = []
+    seconds, peak = measure(lambda: lines.extend(dc.parse_markdown_text(md) for md in markdowns))
+    report("parse_markdown_text", seconds, peak, row_count, docs)
+
+    seconds, peak = measure(lambda: [match_label(matcher, label) for label in labels])
+    report("alias matching", seconds, peak, row_count, docs)
+
+    seconds, peak = measure(lambda: parse_values(cells))
+    report("value parsing", seconds, peak, row_count, docs)
+
+    layout_cache.clear()
+    seconds, peak = measure(lambda: [dc.extract_data_from_lines(doc_lines) for doc_lines in lines])
+    report("extract_data_from_lines", seconds, peak, row_count, docs)
+
+    layout_cache.clear()
+    seconds, peak = measure(lambda: [dc.extract_data_from_tables(tables) for tables in corpus])
+    report("extract_data_from_tables (cold)", seconds, peak, row_count, docs)
+
+    seconds, peak = measure(lambda: [dc.extract_data_from_tables(tables) for tables in corpus])
+    report("extract_data_from_tables (warm)", seconds, peak, row_count, docs)
+
+
+def write_pdf(tables, path):
+    """Lay a synthetic statement out as a text PDF with bordered tables."""
+    from fpdf import FPDF
+
+    pdf = FPDF(orientation="L", unit="mm", format="A4")
+    pdf.set_font("Helvetica", size=8)
+    for title, table in zip(("Balance Sheet", "Profit & Loss Account"), tables):
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 10, title, new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=8)
+        label_width = 90
+        value_width = (pdf.epw - label_width) / (len(table[0]) - 1)
+        for row in table:
+            # Core fonts are latin-1 only
+            row = [cell.encode("latin-1", "replace").decode("latin-1") for cell in row]
+            pdf.cell(label_width, 6, row[0][:60], border=1)
+            for cell in row[1:]:
+                pdf.cell(value_width, 6, cell, border=1, align="R")
+            pdf.ln()
+    pdf.output(path)
+
+
+def run_docling(docs, rows, years):
+    """Convert generated PDFs end to end (triage, Docling, extraction)."""
+    try:
+        import docling  # noqa: F401
+        import fpdf  # noqa: F401
+    except ImportError as e:
+        sys.exit(f"The Docling suite needs docling and fpdf2 installed: {e}")
+
+    corpus = make_corpus(docs, rows=rows, years=years, seed=1)
+    with tempfile.TemporaryDirectory() as folder:
+        pdfs = []
+        for i, tables in enumerate(corpus):
+            path = os.path.join(folder, f"statement_{i}.pdf")
+            write_pdf(tables, path)
+            with open(path, "rb") as file:
+                pdfs.append(file.read())
+
+        # The first conversion loads the models, report it separately
+        start = time.perf_counter()
+        dc.process_pdf_bytes(pdfs[0], "warmup", parallel=False)
+        warmup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = 0
+        for i, pdf_bytes in enumerate(pdfs):
+            result = dc.process_pdf_bytes(pdf_bytes, f"statement_{i}", parallel=False)
+            found += bool(result["data"])
+        seconds = time.perf_counter() - start
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / 2**20 if sys.platform == "darwin" else rss / 1024
+    pages = 2 * docs
+    print(f"Docling: first conversion {warmup:.1f}s, then {docs} documents in {seconds:.1f}s "
+          f"-> {docs / seconds:.2f} docs/s, {pages / seconds:.2f} pages/s, peak RSS {rss_mb:.0f} MB, "
+          f"data found in {found}/{docs}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200, help="Synthetic documents")
+    parser.add_argument("--rows", type=int, default=40, help="Average rows per document")
+    parser.add_argument("--years", type=int, default=4, help="Average year columns")
+    parser.add_argument("--noise", type=float, default=0.3, help="Share of rows matching no field")
+    parser.add_argument("--docling", action="store_true", help="Run the Docling suite instead")
+    parser.add_argument("--pdf-docs", type=int, default=5, help="Generated PDFs for the Docling suite")
+    parser.add_argument("--with-logging", action="store_true",
+                        help="Keep the per-row INFO logging the app does (off to time the code itself)")
+    args = parser.parse_args()
+
+    if not args.with_logging:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    # Keep the benchmark's layout plans out of the app's cache
+    layout_cache.LAYOUT_PATH = os.path.join(tempfile.mkdtemp(), "layouts.jsonl")
+
+    with generated_mappings():
+        if args.docling:
+            run_docling(args.pdf_docs, args.rows, args.years)
+        else:
+            run(args.docs, args.rows, args.years, args.noise)
@@ -0,0 +1,65 @@
+"""
+Field resolution per period: one find_value() call per ratio field (each normalizing
+the whole dict) against a single resolve_fields() pass.
+
+Periods mix alias spellings, casing and stray whitespace, and repeat some fields
+under several aliases with zero and non-zero values, so the non-zero-over-zero
+priority is exercised. Every resolved value must equal find_value()'s.
+
+Run from the repository root:
+    python -m benchmarks.bench_field_resolution [--periods 20000] [--extra-keys 40]
+"""
+import argparse
+import logging
+import random
+import time
+
+from benchmarks.synthetic import NOISE_LABELS, field_aliases, generated_mappings
+from utils.batch_ratios import RATIO_FIELDS
+from utils.general import find_value, resolve_fields
+from utils.mappings import get_field_mappings
+
+
+def make_periods(count, extra_keys, seed=0):
+    """Raw period dicts as extraction leaves them, with unrelated rows around the fields."""
+    rng = random.Random(seed)
+    aliases = field_aliases()
+    periods = []
+    for _ in range(count):
+        data = {f"{rng.choice(NOISE_LABELS)} {i}": rng.uniform(0, 1e6) for i in range(extra_keys)}
+        for field in RATIO_FIELDS:
+            for alias in rng.sample(aliases[field], k=min(len(aliases[field]), rng.randint(0, 2))):
+                key = alias if rng.random() < 0.6 else f" {alias.upper()} "
+                data[key] = 0.0 if rng.random() < 0.3 else round(rng.uniform(-1e6, 1e7), 2)
+        periods.append(data)
+    return periods
+
+
+def run(count, extra_keys):
+    periods = make_periods(count, extra_keys)
+    field_mappings = get_field_mappings()
+
+    start = time.perf_counter()
+    expected = [[find_value(data, field_mappings[field]) for field in RATIO_FIELDS] for data in periods]
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = [resolve_fields(data, field_mappings, RATIO_FIELDS) for data in periods]
+    resolve_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for values, record in zip(expected, records) if values != record.values)
+    print(f"{count:,} periods, {len(RATIO_FIELDS)} fields, ~{extra_keys + len(RATIO_FIELDS)} keys each")
+    print(f"{'path':<30} {'us/period':>10} {'periods/s':>12}")
+    for name, seconds in (("find_value per field", scan_seconds), ("resolve_fields", resolve_seconds)):
+        print(f"{name:<30} {seconds / count * 1e6:>10.1f} {count / seconds:>12,.0f}")
+    print(f"Speed-up {scan_seconds / resolve_seconds:.1f}x, mismatching periods: {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--periods", type=int, default=20_000, help="Periods to resolve")
+    parser.add_argument("--extra-keys", type=int, default=40, help="Unrelated rows per period")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    with generated_mappings():
+        run(args.periods, args.extra_keys)
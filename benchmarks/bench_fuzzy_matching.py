@@ -0,0 +1,143 @@
+"""
+Fuzzy label matching: cost per unmatched label and how many typo labels it recovers.
+
+Labels are aliases with typos (dropped, doubled, swapped or replaced letters, plurals)
+that the exact/substring matcher misses, plus unrelated labels that must stay
+unmatched. The last part times cold table extraction on the synthetic corpus with
+fuzzy matching off and on.
+
+Larger alias sets show what the per-label bounds cost and keep. The time per label
+still grows with the alias set (about 50 -> 70 -> 100 us at 100 / 1k / 10k aliases),
+but far less than scanning every posting list (about 60 -> 250 -> 3,500 us). Recovery
+falls from about 70% to under 50% from 1k aliases on. An unbounded scan recovers the
+same share, because generated aliases of different fields are often too close to call.
+Before the shortlist was re-scored on full trigram sets, the truncated counts alone
+recovered 62% -> 22% -> 0%.
+
+Run from the repository root:
+    python -m benchmarks.bench_fuzzy_matching [--labels 5000] [--sizes 100 1000 10000] [--docs 200]
+"""
+import argparse
+import logging
+import os
+import random
+import string
+import tempfile
+import time
+
+from benchmarks.bench_alias_matching import make_aliases
+from benchmarks.synthetic import NOISE_LABELS, field_aliases, generated_mappings, make_corpus
+from utils import doc_converter as dc
+from utils import layout_cache
+from utils.alias_matcher import build_alias_matcher, match_label
+from utils.fuzzy_matcher import build_fuzzy_index, fuzzy_match
+
+
+def add_typo(rng, alias):
+    """One realistic typo in a word of at least four letters."""
+    words = alias.split()
+    candidates = [i for i, word in enumerate(words) if len(word) >= 4 and word.isalpha()]
+    if not candidates:
+        return None
+    i = rng.choice(candidates)
+    word = words[i]
+    pos = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(5)
+    if kind == 0:
+        word = word[:pos] + word[pos + 1:]
+    elif kind == 1:
+        word = word[:pos] + word[pos] + word[pos:]
+    elif kind == 2:
+        word = word[:pos - 1] + word[pos] + word[pos - 1] + word[pos + 1:]
+    elif kind == 3:
+        word = word[:pos] + rng.choice(string.ascii_lowercase) + word[pos + 1:]
+    else:
+        word = word + "s"
+    words[i] = word
+    return " ".join(words)
+
+
+def make_labels(alias_lookup, count, seed=0):
+    """(label, expected field or None) pairs the exact matcher does not resolve."""
+    rng = random.Random(seed)
+    matcher = build_alias_matcher(alias_lookup)
+    aliases = list(alias_lookup)
+    labels = []
+    while len(labels) < count:
+        if rng.random() < 0.25:
+            label = rng.choice(NOISE_LABELS).lower() if rng.random() < 0.5 else \
+                " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(3))
+            expected = None
+        else:
+            alias = rng.choice(aliases)
+            label = add_typo(rng, alias)
+            expected = alias_lookup[alias]
+        if label and not match_label(matcher, label):
+            labels.append((label, expected))
+    return labels
+
+
+def run_once(name, alias_lookup, label_count):
+    build_start = time.perf_counter()
+    index = build_fuzzy_index(alias_lookup)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    labels = make_labels(alias_lookup, label_count)
+    start = time.perf_counter()
+    results = [fuzzy_match(index, label) for label, _ in labels]
+    seconds = time.perf_counter() - start
+
+    typos = [(result, expected) for result, (_, expected) in zip(results, labels) if expected]
+    noise = [result for result, (_, expected) in zip(results, labels) if not expected]
+    recovered = sum(1 for result, expected in typos if result and result[0] == expected)
+    wrong = sum(1 for result, expected in typos if result and result[0] != expected)
+    false_positive = sum(1 for result in noise if result)
+
+    print(f"{name:<18} {len(alias_lookup):>8} {seconds / len(labels) * 1e6:>10.1f} {build_ms:>9.1f} "
+          f"{recovered / len(typos):>10.0%} {wrong / len(typos):>7.1%} {false_positive / max(1, len(noise)):>10.1%}")
+
+
+def run_extraction(docs):
+    """Per-row cost of fuzzy matching in cold extraction, where every noise row falls through to it."""
+    corpus = make_corpus(docs)
+    row_count = sum(len(table) for tables in corpus for table in tables)
+    timings = {False: float("inf"), True: float("inf")}
+    # Alternate and keep the best of two so warm-up does not favour either side
+    for enabled in (False, True, False, True):
+        dc.FUZZY_ENABLED = enabled
+        layout_cache.clear()
+        start = time.perf_counter()
+        for tables in corpus:
+            dc.extract_data_from_tables(tables)
+        timings[enabled] = min(timings[enabled], time.perf_counter() - start)
+
+    overhead = (timings[True] - timings[False]) / row_count * 1e6
+    print(f"\nCold extraction, {docs} documents, {row_count:,} rows: "
+          f"{timings[False] / row_count * 1e6:.1f} us/row exact only, "
+          f"{timings[True] / row_count * 1e6:.1f} us/row with fuzzy matching (+{overhead:.1f} us/row)")
+
+
+def run(sizes, label_count):
+    print(f"{'alias set':<18} {'aliases':>8} {'us/label':>10} {'build ms':>9} "
+          f"{'recovered':>10} {'wrong':>7} {'noise hit':>10}")
+    aliases = field_aliases()
+    lookup = {alias.strip().lower(): field for field, names in aliases.items() for alias in names}
+    run_once("mapping file", lookup, label_count)
+    for size in sizes:
+        run_once("generated", make_aliases(size), label_count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--labels", type=int, default=5000, help="Unmatched labels per run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Generated alias set sizes")
+    parser.add_argument("--docs", type=int, default=200, help="Synthetic documents for the extraction run")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # Keep the benchmark's layout plans out of the app's cache
+    layout_cache.LAYOUT_PATH = os.path.join(tempfile.mkdtemp(), "layouts.jsonl")
+
+    with generated_mappings():
+        run(args.sizes, args.labels)
+        run_extraction(args.docs)
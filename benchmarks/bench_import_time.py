@@ -0,0 +1,82 @@
+"""
+Cold-start cost: import time and peak RSS of the app's startup imports, with and without
+the heavy dependencies that are now loaded on first use.
+
+Each scenario runs in a fresh interpreter. Run from the repository root:
+    python -m benchmarks.bench_import_time [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# What app.py imports before the first page render
+STARTUP = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "utils.calculate",
+    "utils.doc_converter",
+    "utils.converter_pool",
+    "utils.jobs",
+    "utils.general",
+    "utils.mappings",
+]
+
+SCENARIOS = {
+    # Typing data into the manual-entry form
+    "manual entry": STARTUP,
+    # First upload: Docling plus the pypdfium2 page triage
+    "pdf upload": STARTUP + ["pypdfium2", "docling.document_converter"],
+    # Results page: charts and the printable report
+    "results": STARTUP + ["plotly.express", "plotly.graph_objects", "fpdf"],
+    # Everything that used to load at import time
+    "previous eager imports": STARTUP + [
+        "plotly.express", "plotly.graph_objects", "plotly.subplots", "fpdf",
+        "docling.document_converter", "easyocr", "pdf2image",
+    ],
+}
+
+CHILD = """
+import importlib, json, resource, sys, time
+modules = json.loads(sys.argv[1])
+start = time.perf_counter()
+missing = []
+for module in modules:
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        missing.append(module)
+seconds = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is KiB on Linux and bytes on macOS
+rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({"seconds": seconds, "rss_mb": rss_mb, "missing": missing}))
+"""
+
+
+def measure(modules):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(modules)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    # Module-level loggers may print before the result line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat):
+    print(f"{'scenario':<24} {'import s (median)':>18} {'peak RSS MB':>12}  not installed")
+    for name, modules in SCENARIOS.items():
+        results = [measure(modules) for _ in range(repeat)]
+        seconds = statistics.median(result["seconds"] for result in results)
+        rss_mb = max(result["rss_mb"] for result in results)
+        missing = ", ".join(results[0]["missing"]) or "-"
+        print(f"{name:<24} {seconds:>18.3f} {rss_mb:>12.1f}  {missing}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario")
+    args = parser.parse_args()
+    run(args.repeat)
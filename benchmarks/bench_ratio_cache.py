@@ -0,0 +1,71 @@
+"""
+Streamlit reruns: ratios of every period recalculated on each rerun against the
+per-session ratio cache.
+
+A statement of a few periods is "rerun" many times; every so often one period's value
+or one repayment is edited, as a user would, and only that period should be
+recalculated. Results must equal the uncached ones on every rerun.
+
+Run from the repository root:
+    python -m benchmarks.bench_ratio_cache [--reruns 2000] [--periods 6] [--edit-every 20]
+"""
+import argparse
+import logging
+import random
+import time
+
+from benchmarks.bench_ratio_engine import make_periods
+from benchmarks.synthetic import generated_mappings
+from utils import calculate as calc
+from utils import ratio_cache
+
+
+def same(a, b):
+    return all(a[name]["value"] == b[name]["value"] or a[name]["value"] != a[name]["value"] for name in a)
+
+
+def run(reruns, periods, edit_every):
+    rng = random.Random(0)
+    data, repayments, _ = make_periods(periods)
+    all_years_data = {f"audited-{2018 + i}" if i < periods // 2 else f"projected-{2018 + i}": period
+                      for i, period in enumerate(data)}
+    repayment_values = dict(zip(all_years_data, repayments))
+    cache = ratio_cache.new_cache()
+
+    uncached_seconds = cached_seconds = 0.0
+    mismatches = 0
+    for rerun in range(reruns):
+        if rerun and rerun % edit_every == 0:
+            year = rng.choice(list(all_years_data))
+            if rng.random() < 0.5:
+                field = rng.choice(list(all_years_data[year]))
+                all_years_data[year] = {**all_years_data[year], field: rng.uniform(1e3, 1e7)}
+            else:
+                repayment_values[year] = rng.choice([0, 1e5, 2.5e6])
+
+        start = time.perf_counter()
+        expected = {year: calc.calculate_ratios_for_data(period, repayment_values.get(year, 0))
+                    for year, period in all_years_data.items()}
+        uncached_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        years_ratios = ratio_cache.get_years_ratios(cache, all_years_data, repayment_values)
+        cached_seconds += time.perf_counter() - start
+
+        mismatches += any(not same(expected[year], years_ratios[year]) for year in expected)
+
+    print(f"{reruns:,} reruns of {periods} periods, one edit every {edit_every} reruns")
+    print(f"recalculate every period  {uncached_seconds / reruns * 1e3:8.3f} ms/rerun")
+    print(f"per-session ratio cache   {cached_seconds / reruns * 1e3:8.3f} ms/rerun")
+    print(f"Reruns with differing ratios: {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=2000, help="Simulated reruns")
+    parser.add_argument("--periods", type=int, default=6, help="Periods in the statement")
+    parser.add_argument("--edit-every", type=int, default=20, help="Reruns between edits")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    with generated_mappings():
+        run(args.reruns, args.periods, args.edit_every)
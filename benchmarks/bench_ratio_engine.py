@@ -0,0 +1,83 @@
+"""
+Ratio throughput: the scalar calculate_ratios_for_data() per period against the
+NumPy batch engine over every company and period at once.
+
+Periods carry random amounts with zeros, negatives and missing fields, so every
+division-by-zero branch is hit. The scalar path is timed on a sample and its
+results must equal the batch engine's row for row.
+
+Run from the repository root:
+    python -m benchmarks.bench_ratio_engine [--rows 100000] [--sample 5000]
+"""
+import argparse
+import logging
+import math
+import random
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import field_aliases, generated_mappings
+from utils import calculate as calc
+from utils.batch_ratios import RATIO_FIELDS, calculate_ratio_arrays, field_matrix
+
+
+def make_periods(count, seed=0):
+    """(periods, repayments, scales): period dicts keyed by aliases, as extracted."""
+    rng = random.Random(seed)
+    aliases = field_aliases()
+    periods = []
+    for _ in range(count):
+        data = {}
+        for field in RATIO_FIELDS:
+            roll = rng.random()
+            if roll < 0.05:
+                continue
+            value = 0.0 if roll < 0.12 else round(rng.uniform(-5e6, 5e7), 2)
+            data[rng.choice(aliases[field])] = value
+        periods.append(data)
+    repayments = [rng.choice([0, 0, 1e5, 2.5e6]) for _ in range(count)]
+    scales = [rng.choice([1, 1_000, 100_000]) for _ in range(count)]
+    return periods, repayments, scales
+
+
+def same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+def run(rows, sample):
+    periods, repayments, scales = make_periods(rows)
+    sample = min(sample, rows)
+
+    start = time.perf_counter()
+    scalar = [calc.calculate_ratios_for_data(periods[i], repayments[i], scales[i]) for i in range(sample)]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix, columns = field_matrix(periods, RATIO_FIELDS)
+    matrix_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    arrays = calculate_ratio_arrays(matrix, columns, np.array(repayments), np.array(scales))
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for i in range(sample) for name, ratio in scalar[i].items()
+                     if not same(float(ratio["value"]), float(arrays[name][i])))
+
+    print(f"{rows:,} periods ({sample:,} through the scalar path)")
+    print(f"{'path':<34} {'periods/s':>14} {'us/period':>10}")
+    for name, seconds, count in (("calculate_ratios_for_data", scalar_seconds, sample),
+                                 ("field_matrix (resolve_fields)", matrix_seconds, rows),
+                                 ("calculate_ratio_arrays", batch_seconds, rows)):
+        print(f"{name:<34} {count / seconds:>14,.0f} {seconds / count * 1e6:>10.2f}")
+    print(f"Mismatching values: {mismatches} of {sample * len(arrays):,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Company periods")
+    parser.add_argument("--sample", type=int, default=5_000, help="Periods timed through the scalar path")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    with generated_mappings():
+        run(args.rows, args.sample)
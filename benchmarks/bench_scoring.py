@@ -0,0 +1,89 @@
+"""
+Portfolio scoring throughput: a synthetic book of customers through utils.scoring with
+one and with several worker processes.
+
+Each customer has audited and projected periods keyed by aliases, as extraction leaves
+them. A sample is also scored the way the app does (calculate_ratios_for_data() and
+the decision rule per year) and must give the same decisions.
+
+Run from the repository root:
+    python -m benchmarks.bench_scoring [--customers 50000] [--workers 1 4]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+
+from benchmarks.bench_ratio_engine import make_periods
+from benchmarks.synthetic import generated_mappings
+from utils import calculate as calc
+from utils import scoring
+from utils.decision import decide, decision_years
+from utils.units import SCALES
+
+
+def make_customers(count, seed=0):
+    """Customers with 2-4 audited and 1-3 projected periods each."""
+    rng = random.Random(seed)
+    periods, _, _ = make_periods(count * 7, seed=seed)
+    periods = iter(periods)
+    for i in range(count):
+        first = rng.randint(2015, 2020)
+        audited = rng.randint(2, 4)
+        years = [f"audited-{first + y}" for y in range(audited)]
+        years += [f"projected-{first + audited + y}" for y in range(rng.randint(1, 3))]
+        repayment = rng.choice([0, 1e5, 2.5e6])
+        yield {
+            "id": f"C-{i:06d}",
+            "periods": {year: next(periods) for year in years},
+            "repayment": repayment if rng.random() < 0.5 else {year: repayment for year in years},
+            "unit": rng.choice(list(SCALES)),
+        }
+
+
+def app_decisions(customer):
+    """Decisions per decision year, computed the way the app does."""
+    scale = SCALES[customer["unit"]]
+    repayment = customer["repayment"]
+    decisions = {}
+    for year in decision_years(customer["periods"]):
+        if year is None:
+            continue
+        year_repayment = repayment.get(year, 0) if isinstance(repayment, dict) else repayment
+        decisions[year] = decide(calc.calculate_ratios_for_data(customer["periods"][year], year_repayment, scale))
+    return decisions
+
+
+def run(count, worker_counts, sample):
+    folder = tempfile.mkdtemp()
+    input_path = os.path.join(folder, "customers.jsonl")
+    with open(input_path, "w", encoding="utf-8") as file:
+        for customer in make_customers(count):
+            file.write(json.dumps(customer) + "\n")
+    print(f"{count:,} customers, input {os.path.getsize(input_path) / 2**20:.0f} MB")
+
+    for workers in worker_counts:
+        output_path = os.path.join(folder, f"scores_{workers}.jsonl")
+        summary = scoring.run(input_path, output_path, workers=workers)
+        print(f"  {workers} worker(s): {summary['customers_per_second']:,.0f} customers/s")
+
+    mismatches = 0
+    with open(output_path, "r", encoding="utf-8") as file:
+        for customer, line in zip(make_customers(sample), file):
+            scored = {year: d["decision"] for year, d in json.loads(line)["decisions"].items()}
+            mismatches += scored != app_decisions(customer)
+    print(f"Decisions differing from the app's on {mismatches} of {sample:,} sampled customers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--customers", type=int, default=50_000, help="Customers in the book")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="Worker process counts to time")
+    parser.add_argument("--sample", type=int, default=2_000, help="Customers checked against the app's path")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    with generated_mappings():
+        run(args.customers, args.workers, args.sample)
@@ -0,0 +1,72 @@
+"""
+Status classification: the former linear scan over each ratio's bands against the
+compiled breakpoints, per value (bisect) and per array (np.searchsorted).
+
+Values are spread around every band edge, with NaN for ratios that could not be
+calculated. Outcomes that differ from the linear scan are counted per ratio; there
+should be none, overlapping bands resolve to the band listed first in both.
+
+Run from the repository root:
+    python -m benchmarks.bench_status_lookup [--values 1000000]
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.general import STANDARDS, get_status, get_statuses
+
+
+def linear_status(ratio_type, value):
+    """get_status() as it was: the first band in dict order containing the value."""
+    if pd.isna(value):
+        return "Invalid", "Unable to calculate ratio", "red"
+    for category, criteria in STANDARDS[ratio_type].items():
+        if criteria["min"] <= value < criteria["max"]:
+            return category, criteria["message"], criteria["color"]
+    return "Unknown", "Unable to determine status", "gray"
+
+
+def make_values(count, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(1.2, 1.5, count)
+    # Exact band edges and NaN turn up in real data too
+    edges = rng.random(count) < 0.05
+    values[edges] = rng.choice([0.0, 0.5, 1.0, 1.5, 4.0], edges.sum())
+    values[rng.random(count) < 0.05] = np.nan
+    return values
+
+
+def run(count):
+    values = make_values(count)
+    scalar_sample = values[:min(count, 200_000)]
+    print(f"{count:,} values per ratio (scalar paths timed on {len(scalar_sample):,})")
+    print(f"{'ratio':<16} {'linear ns':>10} {'bisect ns':>10} {'array ns':>9} {'changed':>9}")
+
+    for ratio_type in STANDARDS:
+        start = time.perf_counter()
+        linear = [linear_status(ratio_type, value) for value in scalar_sample]
+        linear_ns = (time.perf_counter() - start) / len(scalar_sample) * 1e9
+
+        start = time.perf_counter()
+        compiled = [get_status(ratio_type, value) for value in scalar_sample]
+        bisect_ns = (time.perf_counter() - start) / len(scalar_sample) * 1e9
+
+        start = time.perf_counter()
+        categories, _, _ = get_statuses(ratio_type, values)
+        array_ns = (time.perf_counter() - start) / count * 1e9
+
+        changed = sum(1 for old, new in zip(linear, compiled) if old != new)
+        assert list(categories[:len(scalar_sample)]) == [status[0] for status in compiled]
+        print(f"{ratio_type:<16} {linear_ns:>10.0f} {bisect_ns:>10.0f} {array_ns:>9.1f} "
+              f"{changed / len(scalar_sample):>9.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--values", type=int, default=1_000_000, help="Values classified per ratio")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    run(args.values)
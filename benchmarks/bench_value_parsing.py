@@ -0,0 +1,64 @@
+"""
+Cell-value parsing: the old per-cell str.replace chain vs the batch parser in utils.values.
+
+Run from the repository root:
+    python -m benchmarks.bench_value_parsing [--sizes 100 10000 100000]
+"""
+import argparse
+import random
+import time
+
+from utils.values import parse_values
+
+CELL_FORMATS = [
+    "{:,.2f}",
+    "({:,.2f})",
+    "$ {:,.0f}",
+    "Rs. {:,.0f}",
+    "NPR {:,.0f}",
+    "−{:.2f}",
+    "-",
+]
+
+
+def make_cells(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(CELL_FORMATS).format(rng.uniform(0, 10_000_000)) for _ in range(count)]
+
+
+def legacy_parse(cell):
+    """The per-cell path formerly inlined in extract_data_to_dict."""
+    try:
+        value = float(cell.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
+    except ValueError:
+        return None
+    return -value if "(" in cell else value
+
+
+def run(sizes, repeat):
+    print(f"{'cells':>8} {'per-cell cells/s':>17} {'batch cells/s':>14} {'speed-up':>9} {'legacy parsed':>14} {'batch parsed':>13}")
+    for size in sizes:
+        cells = make_cells(size)
+
+        legacy_time = batch_time = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            legacy = [legacy_parse(cell) for cell in cells]
+            legacy_time = min(legacy_time, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            _, unparsed = parse_values(cells)
+            batch_time = min(batch_time, time.perf_counter() - start)
+
+        legacy_parsed = sum(value is not None for value in legacy) / size
+        batch_parsed = 1 - unparsed.mean()
+        print(f"{size:>8} {size / legacy_time:>17,.0f} {size / batch_time:>14,.0f} "
+              f"{legacy_time / batch_time:>8.1f}x {legacy_parsed:>13.0%} {batch_parsed:>12.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000], help="Cells per column")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,138 @@
+"""
+Synthetic financial statements for the benchmarks.
+
+Statements are markdown with a Balance Sheet and a Profit & Loss table, built from the
+aliases of the loaded financial_mappings.json (or a generated mapping of the required
+field names when no mapping file is present), with several year columns, an audited/projected
+hint row, bracket negatives, currency prefixes, dash-as-zero cells and noise rows.
+"""
+import json
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from utils import mappings
+from utils.doc_converter import REQUIRED
+from utils.mappings import get_field_mappings
+
+BALANCE_SHEET_FIELDS = {
+    "Total Current Assets", "Total Non-Current Assets", "Total Assets", "Inventory",
+    "Total Current Liabilities", "Total Non-Current Liabilities", "Total Liabilities",
+    "Term Loan", "Total Equity", "Total Liabilities and Equity",
+}
+
+NOISE_LABELS = [
+    "Notes to the financial statements", "Significant accounting policies", "Other receivables",
+    "Advance to suppliers", "Deferred revenue", "Miscellaneous items", "Sundry creditors",
+    "Prepaid insurance", "Security deposits", "Proposed dividend",
+]
+
+VALUE_FORMATS = ["{:,.2f}", "({:,.2f})", "{:,.0f}", "Rs. {:,.0f}", "NPR {:,.0f}", "({:,.0f})"]
+
+
+@contextmanager
+def generated_mappings():
+    """
+    Point the mapping registry at a generated mapping file while the block runs.
+
+    Without a mapping file nothing would match, so a small one is generated from the
+    required field names. The registry's previous path is restored on exit, and
+    nothing changes when a mapping file is loaded.
+    """
+    if any(get_field_mappings().get(field) for field in REQUIRED):
+        yield
+        return
+
+    generated = {field: [field, f"{field} (net)", f"total {field}".replace("total total", "total")]
+                 for field in REQUIRED}
+    previous = mappings.MAPPING_PATH
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "financial_mappings.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"field_mappings": generated}, file)
+        mappings.MAPPING_PATH = Path(path)
+        try:
+            yield
+        finally:
+            mappings.MAPPING_PATH = previous
+
+
+def field_aliases():
+    """Standard field -> aliases to draw labels from (see generated_mappings())."""
+    field_mappings = get_field_mappings()
+    return {field: list(field_mappings.get(field, [])) or [field] for field in REQUIRED}
+
+
+def _label(rng, alias):
+    """Real-world label noise: numbering, note references and casing."""
+    label = alias
+    if rng.random() < 0.3:
+        label = f"{rng.randint(1, 30)}. {label}"
+    if rng.random() < 0.2:
+        label = f"{label} (Note {rng.randint(1, 25)})"
+    if rng.random() < 0.3:
+        label = label.upper() if rng.random() < 0.5 else label.title()
+    return label
+
+
+def _value(rng):
+    if rng.random() < 0.05:
+        return "-"
+    return rng.choice(VALUE_FORMATS).format(rng.uniform(1_000, 50_000_000))
+
+
+def make_tables(rng, aliases, rows=40, years=4, noise=0.3):
+    """
+    One statement as tables of cell text (the structure Docling tables are read into).
+
+    Args:
+        rng (random.Random): Source of randomness.
+        aliases (dict): Output of field_aliases().
+        rows (int): Rows per statement, split over the two tables.
+        years (int): Year columns; the last half are projected.
+        noise (float): Share of rows that match no field.
+
+    Returns:
+        list: [balance sheet rows, profit and loss rows].
+    """
+    first_year = rng.randint(2015, 2022)
+    year_cells = [f"FY {first_year + i}" if rng.random() < 0.3 else str(first_year + i) for i in range(years)]
+    hints = ["Audited" if i < (years + 1) // 2 else "Projected" for i in range(years)]
+
+    tables = []
+    for fields in (sorted(BALANCE_SHEET_FIELDS & set(aliases)), sorted(set(aliases) - BALANCE_SHEET_FIELDS)):
+        table = [["", *hints], ["Particulars", *year_cells]]
+        for _ in range(rows // 2):
+            if rng.random() < noise:
+                label = rng.choice(NOISE_LABELS)
+            else:
+                label = _label(rng, rng.choice(aliases[rng.choice(fields)]))
+            table.append([label, *(_value(rng) for _ in range(years))])
+        tables.append(table)
+    return tables
+
+
+def tables_to_markdown(tables):
+    """Render tables the way Docling's markdown export does."""
+    blocks = []
+    for title, table in zip(("## Balance Sheet", "## Profit & Loss Account"), tables):
+        lines = ["| " + " | ".join(row) + " |" for row in table]
+        lines.insert(1, "|" + "---|" * len(table[0]))
+        blocks.append(f"{title}\n\n" + "\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def make_corpus(docs, rows=40, years=4, noise=0.3, seed=0):
+    """
+    Build a corpus of statements with varying sizes around rows and years.
+
+    Returns:
+        list: Tables per document (see make_tables()).
+    """
+    rng = random.Random(seed)
+    aliases = field_aliases()
+    return [make_tables(rng, aliases, rows=max(4, int(rows * rng.uniform(0.5, 1.5))),
+                        years=max(2, years + rng.randint(-1, 1)), noise=noise)
+            for _ in range(docs)]
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from utils import doc_converter as dc
+from utils import layout_cache, mappings
+
+FIELD_MAPPINGS = {
+    "Total Current Assets": ["Total Current Assets"],
+    "Depreciation": ["Depreciation"],
+    "Profit After Tax": ["Profit After Tax"],
+}
+
+
+@pytest.fixture(autouse=True)
+def mapping_file(tmp_path, monkeypatch):
+    path = tmp_path / "financial_mappings.json"
+    path.write_text(json.dumps({"field_mappings": FIELD_MAPPINGS}), encoding="utf-8")
+    monkeypatch.setattr(mappings, "MAPPING_PATH", path)
+    monkeypatch.setattr(mappings, "SNAPSHOT_FOLDER", str(tmp_path / "mappings"))
+    monkeypatch.setattr(layout_cache, "LAYOUT_PATH", str(tmp_path / "layouts.jsonl"))
+    layout_cache.clear()
+
+
+def test_row_with_a_year_like_amount_is_not_a_header():
+    table = [
+        ["Particulars", "2023", "2024"],
+        ["Total Current Assets", "1,000", "1,200"],
+        ["Depreciation", "2015", "300"],
+        ["Profit After Tax", "500", "600"],
+    ]
+
+    data = dc.extract_data_from_tables([table])
+
+    assert set(data) == {"current_2023", "projected_2024"}
+    assert data["current_2023"] == {"Total Current Assets": 1000.0, "Depreciation": 2015.0, "Profit After Tax": 500.0}
+    assert data["projected_2024"] == {"Total Current Assets": 1200.0, "Depreciation": 300.0, "Profit After Tax": 600.0}
+
+
+def test_header_rows_with_captions_and_hints_are_still_headers():
+    assert dc.find_year_columns(["Particulars", "Note", "FY 2023-24", "Audited 2022"]) == {
+        2: (2023, None), 3: (2022, "audited"),
+    }
+    assert dc.find_year_columns(["", "2015", "300"]) is None
+
+
+def test_unmapped_row_of_year_like_amounts_is_not_a_header():
+    table = [
+        ["Particulars", "2023", "2024"],
+        ["Total Current Assets", "1,000", "1,200"],
+        ["Some Unknown", "2015", "2016"],
+        ["Profit After Tax", "500", "600"],
+    ]
+
+    data = dc.extract_data_from_tables([table])
+
+    assert set(data) == {"current_2023", "projected_2024"}
+    assert data["projected_2024"] == {"Total Current Assets": 1200.0, "Profit After Tax": 600.0}
+
+
+@pytest.mark.parametrize("table", [
+    [["Particulars", "Audited 2023", "Audited 2022"],
+     ["Total Current Assets", "1,200", "1,000"]],
+    [["", "Audited", "Audited"],
+     ["Particulars", "2023", "2022"],
+     ["Total Current Assets", "1,200", "1,000"]],
+])
+def test_audited_only_statement_projects_from_its_latest_year(table):
+    data = dc.extract_data_from_tables([table])
+
+    assert data == {"audited_2022": {"Total Current Assets": 1000.0},
+                    "projected_2023": {"Total Current Assets": 1200.0}}
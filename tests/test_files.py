@@ -0,0 +1,37 @@
+import json
+import threading
+
+import pytest
+
+from utils.files import atomic_open
+
+
+def test_concurrent_writers_of_one_path_never_share_a_temp_file(tmp_path):
+    path = tmp_path / "entry.json"
+
+    def write(n):
+        for _ in range(50):
+            with atomic_open(str(path)) as file:
+                json.dump({"writer": n, "payload": "x" * 10_000}, file)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert json.loads(path.read_text(encoding="utf-8"))["writer"] in range(4)
+    assert [p.name for p in tmp_path.iterdir()] == ["entry.json"]
+
+
+def test_failed_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "entry.json"
+    path.write_text("old", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        with atomic_open(str(path)) as file:
+            file.write("half")
+            raise ValueError("boom")
+
+    assert path.read_text(encoding="utf-8") == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["entry.json"]
@@ -0,0 +1,11 @@
+from utils import fuzzy_matcher as fm
+
+
+def test_typo_is_recovered_when_common_trigrams_exceed_the_budget(monkeypatch):
+    lookup = {f"total assets line {i}": f"Field {i}" for i in range(50)}
+    lookup["total current assets"] = "Total Current Assets"
+    index = fm.build_fuzzy_index(lookup)
+    monkeypatch.setattr(fm, "MAX_POSTINGS", 20)
+
+    assert fm.fuzzy_match(index, "Total Curent Assets")[0] == "Total Current Assets"
+    assert fm.fuzzy_match(index, "Retained Earnings") is None
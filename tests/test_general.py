@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from utils.general import STANDARDS, get_status, get_statuses
+
+EDGES = [-1.0, 0.0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 4.0, 10.0]
+
+
+def first_listed_band(ratio_type, value):
+    for category, criteria in STANDARDS[ratio_type].items():
+        if criteria["min"] <= value < criteria["max"]:
+            return category
+    return "Unknown"
+
+
+@pytest.mark.parametrize("ratio_type", list(STANDARDS))
+def test_statuses_match_the_first_listed_band(ratio_type):
+    expected = [first_listed_band(ratio_type, value) for value in EDGES]
+
+    assert [get_status(ratio_type, value)[0] for value in EDGES] == expected
+    assert list(get_statuses(ratio_type, np.array(EDGES))[0]) == expected
+
+
+def test_overlapping_bands_keep_their_original_status():
+    assert get_status("ICR", 2.0)[0] == "strong"
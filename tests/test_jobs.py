@@ -0,0 +1,44 @@
+import threading
+import time
+
+from utils import jobs
+
+
+def wait_for(job_id, states, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = jobs.get_status(job_id)["status"]
+        if status in states:
+            return status
+        time.sleep(0.01)
+    return jobs.get_status(job_id)["status"]
+
+
+def test_stuck_jobs_give_their_slot_back_when_cancelled_or_timed_out(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_WORKERS", 2)
+    release = threading.Event()
+
+    def stuck(progress=None):
+        progress(0.1, "stuck")
+        release.wait(5)
+        return "late"
+
+    def quick(progress=None):
+        return "ok"
+
+    try:
+        jobs.submit(stuck, job_id="test-stuck-1", timeout=0.05)
+        jobs.submit(stuck, job_id="test-stuck-2")
+        jobs.submit(quick, job_id="test-quick")
+        assert wait_for("test-stuck-2", (jobs.RUNNING,)) == jobs.RUNNING
+        assert jobs.get_status("test-quick")["status"] == jobs.QUEUED
+
+        jobs.cancel("test-stuck-2")
+        time.sleep(0.1)
+        assert jobs.get_status("test-stuck-1")["status"] == jobs.TIMED_OUT
+
+        assert wait_for("test-quick", (jobs.DONE,)) == jobs.DONE
+        assert jobs.get_status("test-quick")["result"] == "ok"
+        assert jobs.get_status("test-stuck-2")["status"] == jobs.CANCELLED
+    finally:
+        release.set()
@@ -0,0 +1,45 @@
+from PIL import Image
+
+from utils import ocr
+
+
+class FakeReader:
+    def __init__(self):
+        self.batches = []
+
+    def readtext_batched(self, arrays, n_width, n_height, batch_size):
+        assert all(array.shape[:2] == (n_height, n_width) for array in arrays)
+        self.batches.append(len(arrays))
+        return [[(None, f"{n_width}x{n_height}", 1.0)] for _ in arrays]
+
+
+def test_statement_pages_past_the_cap_are_chosen_by_relevance():
+    pages = list(range(1, 151))
+    scores = {97: 12, 99: 9, 3: 1}
+
+    chosen = ocr.choose_pages(pages, scores, limit=8)
+
+    assert chosen == [2, 3, 4, 96, 97, 98, 99, 100]
+
+
+def test_fully_scanned_report_reads_the_probed_statement_pages(monkeypatch):
+    read = []
+    monkeypatch.setattr(ocr, "OCR_MAX_PAGES", 6)
+    monkeypatch.setattr(ocr, "probe_scores", lambda pdf, pages, keywords, progress: {120: 10})
+    monkeypatch.setattr(ocr, "rasterize_pages", lambda pdf, pages: read.extend(pages) or pages)
+    monkeypatch.setattr(ocr, "read_pages", lambda images: [[] for _ in images])
+
+    ocr.ocr_tables(b"", list(range(1, 151)), keywords={"balance sheet"})
+
+    assert read == [117, 118, 119, 120, 121, 122]
+
+
+def test_portrait_and_landscape_pages_are_read_in_separate_batches(monkeypatch):
+    reader = FakeReader()
+    monkeypatch.setattr(ocr, "get_reader", lambda: reader)
+    images = [Image.new("RGB", (60, 80)), Image.new("RGB", (80, 60)), Image.new("RGB", (60, 80))]
+
+    detections = ocr.read_pages(images)
+
+    assert [page[0][1] for page in detections] == ["60x80", "80x60", "60x80"]
+    assert sorted(reader.batches) == [1, 2]
@@ -0,0 +1,33 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import parallel_convert as pc
+
+
+def test_each_worker_count_gets_its_own_pool(monkeypatch):
+    monkeypatch.setattr(pc, "_executors", {})
+    try:
+        assert pc._get_executor(1) is pc._get_executor(1)
+        assert pc._get_executor(2) is not pc._get_executor(1)
+        assert pc._get_executor(2)._max_workers == 2
+    finally:
+        for executor in pc._executors.values():
+            executor.shutdown()
+
+
+def test_workers_read_the_pdf_from_one_temporary_file(monkeypatch):
+    seen = []
+
+    class Converter:
+        def convert(self, pdf_path, page_range):
+            with open(pdf_path, "rb") as file:
+                seen.append((os.path.basename(pdf_path), file.read(), page_range))
+            return type("Result", (), {"document": page_range})()
+
+    monkeypatch.setattr(pc, "_worker_converter", Converter())
+    monkeypatch.setattr(pc, "_get_executor", lambda workers: ThreadPoolExecutor(workers))
+
+    documents = pc.convert_pdf_parallel(b"%PDF-1.4 test", "report", pages=[1, 2, 3, 4], workers=2)
+
+    assert documents == [(1, 1), (2, 2), (3, 3), (4, 4)]
+    assert {(name, data) for name, data, _ in seen} == {("report.pdf", b"%PDF-1.4 test")}
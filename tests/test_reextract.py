@@ -0,0 +1,25 @@
+from utils.alias_matcher import build_alias_matcher
+from utils.fuzzy_matcher import build_fuzzy_index
+from utils.reextract import is_affected
+
+CURRENT = {"total current assets": "Total Current Assets", "interest expense": "Interest Expense"}
+
+
+def test_label_fuzzily_matching_a_changed_alias_is_affected():
+    changed = {"interest expense"}
+    changed_matcher = build_alias_matcher({alias: alias for alias in changed})
+    changed_index = build_fuzzy_index(dict.fromkeys(changed, "changed"))
+    tables = [[["Particulars", "2023"], ["Interst Expense", "120"]]]
+
+    assert not is_affected(tables, changed_matcher)
+    assert is_affected(tables, changed_matcher, changed_index, build_alias_matcher(CURRENT))
+
+
+def test_labels_matched_by_unchanged_aliases_are_not_affected():
+    changed = {"total curent assets"}
+    changed_matcher = build_alias_matcher({alias: alias for alias in changed})
+    changed_index = build_fuzzy_index(dict.fromkeys(changed, "changed"))
+    tables = [[["Total Current Assts", "1,000"]], [["Total Current Assets", "1,000"]]]
+
+    assert is_affected(tables[:1], changed_matcher, changed_index, build_alias_matcher(CURRENT))
+    assert not is_affected(tables[1:], changed_matcher, changed_index, build_alias_matcher(CURRENT))
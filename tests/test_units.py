@@ -0,0 +1,13 @@
+import pytest
+
+from utils.units import detect_unit
+
+
+@pytest.mark.parametrize("header", ["(Rs. 000)", "Amount (NPR 000)", "NPR in 000", "Rs 000", "000 Rs.", "Rs. in '000"])
+def test_bare_000_next_to_a_currency_is_thousands(header):
+    assert detect_unit(["Particulars", header, "2023"]) == "Thousands ('000)"
+
+
+@pytest.mark.parametrize("header", ["Amount (NPR)", "Rs. 1,000", "Rs. 10,000,000", "NPR 2000"])
+def test_currency_without_a_unit_is_rupees(header):
+    assert detect_unit(["Particulars", header]) == "Rupees"
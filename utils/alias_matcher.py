@@ -0,0 +1,89 @@
+from collections import deque
+from .logs import setup_logger
+
+logger = setup_logger()
+
+
+def build_alias_matcher(alias_lookup):
+    """
+    Compile every alias into an Aho-Corasick automaton.
+
+    Args:
+        alias_lookup (dict): Lower-cased alias -> standard field (see create_alias_lookup()).
+
+    Returns:
+        dict: Automaton with per-state transitions ("goto"), failure links ("fail") and
+            the longest alias ending in each state ("best", as (length, alias) or None).
+    """
+    goto = [{}]
+    best = [None]
+
+    # Trie of all aliases
+    for alias in alias_lookup:
+        if not alias:
+            continue
+        state = 0
+        for char in alias:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][char] = next_state
+                goto.append({})
+                best.append(None)
+            state = next_state
+        best[state] = (len(alias), alias)
+
+    # Failure links, breadth first so shallower states are finished first
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0)
+
+            # An alias ending in the fallback state also ends here; keep the longest
+            inherited = best[fail[next_state]]
+            if inherited and (best[next_state] is None or inherited[0] > best[next_state][0]):
+                best[next_state] = inherited
+
+    logger.info(f"Alias matcher compiled: {len(alias_lookup)} aliases, {len(goto)} states.")
+    return {"goto": goto, "fail": fail, "best": best, "lookup": alias_lookup}
+
+
+def match_label(matcher, raw_label):
+    """
+    Find the standard field for a row label.
+
+    An exact alias wins outright; otherwise the label is scanned once and the
+    longest alias it contains is used (the earliest one on a tie).
+
+    Args:
+        matcher (dict): Automaton from build_alias_matcher().
+        raw_label (str): Lower-cased, stripped row label.
+
+    Returns:
+        tuple or None: (standard_field, alias) or None if no alias occurs in the label.
+    """
+    lookup = matcher["lookup"]
+    standard_field = lookup.get(raw_label)
+    if standard_field:
+        return standard_field, raw_label
+
+    goto, fail, best = matcher["goto"], matcher["fail"], matcher["best"]
+    state = 0
+    found = None
+    for char in raw_label:
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        candidate = best[state]
+        if candidate and (found is None or candidate[0] > found[0]):
+            found = candidate
+
+    if found is None:
+        return None
+    return lookup[found[1]], found[1]
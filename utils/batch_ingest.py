@@ -0,0 +1,179 @@
+"""
+Headless batch ingestion: convert a directory of PDFs to one JSONL record per document.
+
+Usage (from the repository root):
+    python -m utils.batch_ingest statements/ -o extracted.jsonl -w 4
+
+Records are appended as each document finishes. Re-running with the same output file
+skips documents whose SHA-256 already has a successful record, so an interrupted run
+resumes where it stopped.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from . import conversion_cache
+from .logs import setup_logger
+from .units import SCALES
+
+logger = setup_logger()
+
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_pdfs(directory, recursive=True):
+    """Return the PDFs under directory, sorted for a stable processing order."""
+    pattern = "**/*.pdf" if recursive else "*.pdf"
+    return sorted(path for path in Path(directory).glob(pattern) if path.is_file())
+
+
+def completed_hashes(output_path):
+    """SHA-256 of every document that already has a successful record in the output."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash, the document is simply redone
+                continue
+            if record.get("status") == "ok":
+                done.add(record["sha256"])
+    return done
+
+
+def _init_worker(threads_per_worker):
+    # Keep each worker's torch runtime from claiming every core
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+
+
+def ingest_file(path, sha256):
+    """
+    Convert and extract one PDF in a worker process.
+
+    Returns:
+        dict: JSONL record with file, sha256, status, data / error, unit, scale, pages and
+            seconds.
+    """
+    start = time.perf_counter()
+    record = {"file": str(path), "sha256": sha256}
+    try:
+        from . import doc_converter
+
+        pdf_bytes = Path(path).read_bytes()
+        cache_key = conversion_cache.make_key(pdf_bytes)
+        cached = conversion_cache.get(cache_key)
+
+        if cached is not None:
+            data, triage, unit = cached["data"], cached.get("triage"), cached.get("unit", "Rupees")
+        else:
+            # Documents are already spread over the workers, no nested page-parallel pool
+            result = doc_converter.process_pdf_bytes(pdf_bytes, Path(path).stem, parallel=False)
+            data, triage, unit = result["data"], result["triage"], result["unit"]
+            if data:
+                conversion_cache.put(cache_key, result["tables"], data, triage=triage,
+                                     pdf_sha256=sha256, file_name=Path(path).stem, unit=unit)
+
+        record.update({
+            "status": "ok" if data else "empty",
+            "data": data,
+            "unit": unit,
+            "scale": SCALES[unit],
+            "pages": triage["selected_pages"] if triage else None,
+            "cached": cached is not None,
+        })
+
+    except Exception as e:
+        logger.error(f"Batch ingestion failed for {path}: {e}")
+        record.update({"status": "error", "error": str(e)})
+
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+def run(directory, output_path, workers=DEFAULT_WORKERS, recursive=True):
+    """
+    Convert every new PDF under directory and append the records to output_path.
+
+    Returns:
+        dict: Summary with processed, skipped, failed, seconds and docs_per_minute.
+    """
+    pdfs = find_pdfs(directory, recursive)
+    done = completed_hashes(output_path)
+
+    pending = []
+    for path in pdfs:
+        sha256 = file_sha256(path)
+        if sha256 in done:
+            continue
+        # The same statement filed twice is only converted once
+        done.add(sha256)
+        pending.append((path, sha256))
+
+    skipped = len(pdfs) - len(pending)
+    print(f"{len(pdfs)} PDFs found, {skipped} already done, {len(pending)} to convert on {workers} worker(s).")
+
+    start = time.perf_counter()
+    processed = failed = 0
+    if pending:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,),
+        ) as executor, open(output_path, "a", encoding="utf-8") as output:
+            futures = [executor.submit(ingest_file, path, sha256) for path, sha256 in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                output.write(json.dumps(record) + "\n")
+                # Flush per record so a crash loses at most the documents in flight
+                output.flush()
+
+                processed += 1
+                failed += record["status"] != "ok"
+                print(f"[{processed}/{len(pending)}] {record['status']:<5} {record['seconds']:>7.1f}s  {record['file']}")
+
+    seconds = time.perf_counter() - start
+    docs_per_minute = processed / seconds * 60 if seconds else 0.0
+    summary = {
+        "processed": processed,
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": round(seconds, 1),
+        "docs_per_minute": round(docs_per_minute, 2),
+    }
+    print(f"Done: {processed} converted ({failed} not ok), {skipped} skipped in {seconds:.1f}s "
+          f"-> {docs_per_minute:.2f} docs/minute.")
+    logger.info(f"Batch ingestion summary: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Directory containing the PDF statements")
+    parser.add_argument("-o", "--output", default="extracted.jsonl", help="JSONL file to append records to")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes")
+    parser.add_argument("--no-recursive", action="store_true", help="Only look at the top-level directory")
+    args = parser.parse_args(argv)
+
+    run(args.directory, args.output, workers=max(1, args.workers), recursive=not args.no_recursive)
+
+
+if __name__ == "__main__":
+    main()
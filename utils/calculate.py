@@ -1,5 +1,6 @@
 from utils.logs import setup_logger
-from .general import find_value, get_status, FIELD_MAPPINGS
+from .general import get_status, resolve_fields
+from .mappings import get_field_mappings
 
 
 
@@ -86,25 +87,38 @@ def calculate_qr(current_assets, current_liabilities, inventory=0):
     return safe_division((current_assets - inventory), current_liabilities)
 
 
-def calculate_ratios_for_data(data, principal_repayment=0):
-    """Calculate all financial ratios for a given data set."""
+def calculate_ratios_for_data(data, principal_repayment=0, scale=1):
+    """
+    Calculate all financial ratios for a given data set.
+
+    Args:
+        data (dict): Standard field -> value, as stated in the statement.
+        principal_repayment (float): Principal repayment in rupees.
+        scale (float): Rupees per statement unit (1000 for "Rs. in '000", see utils.units).
+            The ratios are scale invariant, only EBITDA is scaled and the repayment
+            is brought into statement units for DSCR.
+    """
 
     # print(f"calculate_ratios_for_data - {principal_repayment}")
-    logger.info(f"Data :{data}")
+    # Formatted only when DEBUG is on, the whole dict on every call bloated the log
+    logger.debug("Data: %s", data)
+    FIELD_MAPPINGS = get_field_mappings()
+    # Normalize the data once, then read each field from its slot
+    fields = resolve_fields(data, FIELD_MAPPINGS)
     # PL
-    operating_profit = find_value(data, FIELD_MAPPINGS["Net Operating Profit"])
-    interest_expense = find_value(data, FIELD_MAPPINGS["Interest Expense"])
-    depreciation = find_value(data, FIELD_MAPPINGS["Depreciation"])
-    amortization = find_value(data, FIELD_MAPPINGS["Amortization"])
-    taxation = find_value(data, FIELD_MAPPINGS["Taxation"])
-    administration_expense = find_value(data, FIELD_MAPPINGS["Administration Expenses"])
-    profit_after_tax = find_value(data,FIELD_MAPPINGS["Profit After Tax"])
+    operating_profit = fields["Net Operating Profit"]
+    interest_expense = fields["Interest Expense"]
+    depreciation = fields["Depreciation"]
+    amortization = fields["Amortization"]
+    taxation = fields["Taxation"]
+    administration_expense = fields["Administration Expenses"]
+    profit_after_tax = fields["Profit After Tax"]
 
     #BS
-    total_liabilities = find_value(data, FIELD_MAPPINGS["Total Liabilities"])
-    current_liabilities = find_value(data, FIELD_MAPPINGS["Total Current Liabilities"])
-    total_equity = find_value(data, FIELD_MAPPINGS["Total Equity"])
-    current_assets = find_value(data, FIELD_MAPPINGS["Total Current Assets"])
+    total_liabilities = fields["Total Liabilities"]
+    current_liabilities = fields["Total Current Liabilities"]
+    total_equity = fields["Total Equity"]
+    current_assets = fields["Total Current Assets"]
 
     # total_liabilities_equity = find_value(data, FIELD_MAPPINGS["total_liabilities_equity"]) # Can be removed
     # non_current_liabilities = find_value(data, FIELD_MAPPINGS["total_non_current_liabilities"]) # Can be removed
@@ -118,16 +132,16 @@ def calculate_ratios_for_data(data, principal_repayment=0):
     # if total_equity == 0:
     #     total_equity = total_liabilities_equity - total_liabilities
 
-    term_loan = find_value(data, FIELD_MAPPINGS["Term Loan"]) # Long term Debt
-    inventory = find_value(data, FIELD_MAPPINGS["Inventory"])
+    term_loan = fields["Term Loan"] # Long term Debt
+    inventory = fields["Inventory"]
 
 
     ratios = {
-        "EBITDA": {"value": calculate_ebitda(operating_profit, interest_expense, depreciation, amortization, taxation, profit_after_tax, administration_expense)},
+        "EBITDA": {"value": calculate_ebitda(operating_profit, interest_expense, depreciation, amortization, taxation, profit_after_tax, administration_expense) * scale},
         "Leverage Ratio": {"value": calculate_leverage_ratio(total_liabilities, total_equity)},
         "Gear Ratio": {"value": calculate_gear_ratio(term_loan, total_equity)},
         "ICR": {"value": calculate_icr(interest_expense, depreciation, amortization, operating_profit)},
-        "DSCR": {"value": calculate_dscr(interest_expense, depreciation, amortization, operating_profit, principal_repayment)},
+        "DSCR": {"value": calculate_dscr(interest_expense, depreciation, amortization, operating_profit, principal_repayment / scale)},
         "CR": {"value": calculate_cr(current_assets, current_liabilities)},
         "QR": {"value": calculate_qr(current_assets, current_liabilities, inventory)}
     }
@@ -140,5 +154,5 @@ def calculate_ratios_for_data(data, principal_repayment=0):
     
     # print(f"calculate_ratios_for_data - Ratios: {[(ratio_name,ratios[ratio_name]['value']) for ratio_name in ratios]}")
     # print(f"{'***********'*2}")
-    logger.info(f"Ratios: {ratios}")
+    logger.debug("Ratios: %s", ratios)
     return ratios
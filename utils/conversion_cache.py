@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import time
+from importlib import metadata
+from .files import atomic_open
+from .logs import setup_logger
+from .mappings import mapping_version
+
+logger = setup_logger()
+
+CACHE_FOLDER = "cache/conversions/"
+
+# Bump whenever the table -> dict extraction logic changes so that stale
+# entries produced by an older extractor are never served.
+EXTRACTOR_VERSION = "9"
+
+# Upper bound on the total size of the cache folder (bytes)
+MAX_CACHE_BYTES = int(os.environ.get("CONVERSION_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+ENTRY_SUFFIX = ".json"
+
+
+def converter_version():
+    """Return a version string covering Docling and our own extractor."""
+    try:
+        docling_version = metadata.version("docling")
+    except metadata.PackageNotFoundError:
+        docling_version = "unknown"
+    return f"docling-{docling_version}/extractor-{EXTRACTOR_VERSION}"
+
+
+def make_key(pdf_bytes):
+    """
+    Build the cache key for an uploaded PDF.
+
+    Args:
+        pdf_bytes (bytes): Raw bytes of the uploaded PDF.
+
+    Returns:
+        str: SHA-256 over the PDF's SHA-256, the converter version and the mapping version.
+    """
+    return make_key_for_digest(hashlib.sha256(pdf_bytes).hexdigest())
+
+
+def make_key_for_digest(pdf_sha256):
+    """Same as make_key(), from the PDF's SHA-256 (used to re-key entries after a mapping change)."""
+    digest = hashlib.sha256(pdf_sha256.encode("utf-8"))
+    digest.update(converter_version().encode("utf-8"))
+    digest.update(mapping_version().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_FOLDER, f"{key}{ENTRY_SUFFIX}")
+
+
+def get(key):
+    """
+    Look up a cached conversion.
+
+    Args:
+        key (str): Key produced by make_key().
+
+    Returns:
+        dict or None: {"tables": list, "data": dict, "unit": str, "triage": dict} on a hit,
+            None on a miss.
+    """
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            entry = json.load(file)
+    except FileNotFoundError:
+        logger.info(f"Conversion cache miss: {key[:12]}")
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+        _remove(path)
+        return None
+
+    # Refresh the modification time so eviction treats this entry as recently used
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+    logger.info(f"Conversion cache hit: {key[:12]}")
+    return entry
+
+
+def put(key, tables, data, triage=None, pdf_sha256=None, file_name=None, unit="Rupees"):
+    """
+    Store a conversion result and evict old entries if the cache is over its size bound.
+
+    Args:
+        key (str): Key produced by make_key().
+        tables (list): Tables read from the Docling document, as rows of cell text.
+        data (dict): Structured data extracted from the tables.
+        triage (dict, optional): Page triage report (see utils.page_triage).
+        pdf_sha256 (str, optional): SHA-256 of the PDF, lets utils.reextract re-key
+            the entry when the field mappings change.
+        file_name (str, optional): Name of the uploaded document, for reports.
+        unit (str): Statement unit detected by utils.units.detect_unit().
+    """
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        path = _entry_path(key)
+
+        entry = {
+            "tables": tables,
+            "data": data,
+            "unit": unit,
+            "triage": triage,
+            "pdf_sha256": pdf_sha256,
+            "file_name": file_name,
+            "converter_version": converter_version(),
+            "mapping_version": mapping_version(),
+            "created": time.time(),
+        }
+
+        with atomic_open(path) as file:
+            json.dump(entry, file)
+
+        logger.info(f"Conversion cached: {key[:12]}")
+        evict()
+
+    except Exception as e:
+        logger.error(f"Failed to cache conversion {key[:12]}: {e}")
+
+
+def iter_entries():
+    """
+    Iterate over every readable cache entry.
+
+    Yields:
+        tuple: (key, entry) with entry as returned by get().
+    """
+    if not os.path.isdir(CACHE_FOLDER):
+        return
+    for name in sorted(os.listdir(CACHE_FOLDER)):
+        if not name.endswith(ENTRY_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(CACHE_FOLDER, name), "r", encoding="utf-8") as file:
+                yield name[:-len(ENTRY_SUFFIX)], json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable cache entry {name}: {e}")
+
+
+def evict(max_bytes=None):
+    """
+    Remove least recently used entries until the cache fits in max_bytes.
+
+    Args:
+        max_bytes (int, optional): Size bound, defaults to MAX_CACHE_BYTES.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_FOLDER):
+        return 0
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_FOLDER):
+        if not name.endswith(ENTRY_SUFFIX):
+            continue
+        path = os.path.join(CACHE_FOLDER, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    removed = 0
+    # Oldest modification time == least recently used
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if _remove(path):
+            total -= size
+            removed += 1
+
+    if removed:
+        logger.info(f"Evicted {removed} conversion cache entries ({total} bytes remain).")
+    return removed
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,123 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Number of Docling converters shared by every Streamlit session in this process
+POOL_SIZE = max(1, int(os.environ.get("CONVERTER_POOL_SIZE", "2")))
+
+# Docling gives up on a document after this many seconds, freeing the converter
+DOCUMENT_TIMEOUT = float(os.environ.get("CONVERSION_TIMEOUT", "300"))
+
+# Set CONVERTER_WARMUP=1 to load the models when the server starts
+WARMUP_ON_START = os.environ.get("CONVERTER_WARMUP", "0") == "1"
+
+# LIFO so the most recently used (warmest) converter is handed out first
+_idle = queue.LifoQueue()
+_created = 0
+_lock = threading.Lock()
+
+
+def _build_converter():
+    """Create a DocumentConverter and load its PDF pipeline (layout + table models)."""
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+
+    pipeline_options = PdfPipelineOptions(document_timeout=DOCUMENT_TIMEOUT)
+    converter = DocumentConverter(
+        format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+    )
+    converter.initialize_pipeline(InputFormat.PDF)
+    return converter
+
+
+def _reserve_slot():
+    """Reserve a slot for a new converter, returns False if the pool is full."""
+    global _created
+    with _lock:
+        if _created >= POOL_SIZE:
+            return False
+        _created += 1
+        return True
+
+
+def _release_slot():
+    global _created
+    with _lock:
+        _created -= 1
+
+
+def _new_converter():
+    # Model loading happens outside the lock so sessions do not serialize on it
+    try:
+        converter = _build_converter()
+    except Exception:
+        _release_slot()
+        raise
+    logger.info(f"Docling converter created ({_created}/{POOL_SIZE}).")
+    return converter
+
+
+@contextmanager
+def acquire_converter(timeout=None):
+    """
+    Borrow a pre-warmed DocumentConverter from the process-wide pool.
+
+    A converter is used by one caller at a time and returned to the pool on exit.
+    New converters are built lazily until POOL_SIZE is reached, after which
+    callers wait for an idle one.
+
+    Args:
+        timeout (float, optional): Seconds to wait for an idle converter.
+
+    Raises:
+        queue.Empty: If no converter became available within the timeout.
+    """
+    try:
+        converter = _idle.get_nowait()
+    except queue.Empty:
+        if _reserve_slot():
+            converter = _new_converter()
+        else:
+            logger.info("All converters busy, waiting for an idle one.")
+            converter = _idle.get(timeout=timeout)
+
+    try:
+        yield converter
+    finally:
+        _idle.put(converter)
+
+
+def warm_up(count=None):
+    """
+    Build converters ahead of the first upload.
+
+    Args:
+        count (int, optional): Number of converters to create, defaults to POOL_SIZE.
+
+    Returns:
+        int: Number of converters created.
+    """
+    count = POOL_SIZE if count is None else min(count, POOL_SIZE)
+    created = 0
+    while created < count and _reserve_slot():
+        try:
+            _idle.put(_new_converter())
+        except Exception as e:
+            logger.error(f"Converter warm-up failed: {e}")
+            break
+        created += 1
+
+    logger.info(f"Converter pool warmed with {created} converter(s).")
+    return created
+
+
+def warm_up_in_background(count=None):
+    """Run warm_up() on a daemon thread so the first page render is not blocked."""
+    thread = threading.Thread(target=warm_up, args=(count,), name="converter-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,58 @@
+from .doc_converter import extract_year_from_key, is_audited, is_projected
+
+# Green ratios (EBITDA not counted) needed for each outcome
+ACCEPT_RATIO_PARAM = 6 # 6
+DESIRABLE_RATIO_PARAM = (ACCEPT_RATIO_PARAM/2) # 3
+REJECT_RATIO_PARAM = DESIRABLE_RATIO_PARAM # 3
+
+GREEN = "GREEN"
+AMBER = "AMBER"
+RED = "RED"
+
+
+def decision_years(year_keys):
+    """
+    The years a decision may be taken on: the latest audited and the first projected.
+
+    Args:
+        year_keys (iterable): Keys like 'audited-2023' or 'projected-2025'.
+
+    Returns:
+        tuple: (latest audited key, first projected key), None where there is none.
+    """
+    audited_years = sorted((y for y in year_keys if is_audited(y)), key=extract_year_from_key)
+    projected_years = sorted((y for y in year_keys if is_projected(y)), key=extract_year_from_key)
+    return (audited_years[-1] if audited_years else None,
+            projected_years[0] if projected_years else None)
+
+
+def count_green(ratios):
+    """Number of ratios other than EBITDA whose status colour is green."""
+    return sum(1 for ratio_name, ratio_data in ratios.items()
+               if ratio_name != "EBITDA" and ratio_data["color"] == "green")
+
+
+def decide(ratios):
+    """
+    GREEN/AMBER/RED decision for one year's ratios.
+
+    Args:
+        ratios (dict): Ratio name -> {"value", "status", "message", "color"}, as returned
+            by calculate_ratios_for_data().
+
+    Returns:
+        str or None: GREEN, AMBER or RED; None when no ratio is green or the count falls
+            between the reject and accept thresholds (4 or 5 green with the defaults).
+    """
+    green = count_green(ratios)
+    if not green:
+        return None
+
+    decision = None
+    if green >= ACCEPT_RATIO_PARAM: # 6
+        decision = GREEN
+    if green == REJECT_RATIO_PARAM: # 3
+        decision = AMBER
+    if green < REJECT_RATIO_PARAM: # 3
+        decision = RED
+    return decision
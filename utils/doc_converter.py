@@ -1,19 +1,23 @@
-from docling.document_converter import DocumentConverter
-from pdf2image import convert_from_path
-import easyocr
+import hashlib
 from pathlib import Path
 import re
-import heapq
-import numpy as np
 import json
 import os
+from . import conversion_cache, converter_pool, layout_cache, ocr, page_triage, parallel_convert, units, workspace
+from .alias_matcher import match_label
+from .fuzzy_matcher import FUZZY_ENABLED, fuzzy_match
+from .jobs import JobCancelled
+from .mappings import get_alias_matcher, get_field_mappings, get_fuzzy_index
+from .values import parse_value, parse_values
 from .logs import setup_logger
 
 logger = setup_logger()
 
 TEMP_FOLDER = "temp/"
 MARKDOWN = ".md"
-FINANCIAL_MAPPING = "financial_mappings.json"
+
+# Set PERSIST_OUTPUTS=1 to keep markdown/JSON/triage artifacts of each upload in temp/jobs/
+PERSIST_OUTPUTS = os.environ.get("PERSIST_OUTPUTS", "0") == "1"
 
 REQUIRED = [ 
             "Total Current Assets",
@@ -38,667 +42,564 @@ REQUIRED = [
 
 normalized_required = {x.strip().lower() for x in REQUIRED}
 
-def pdf_to_md(file_object, file_name:str):
-    """
-    Convert an uploaded PDF file (as BytesIO) into a markdown file using Docling.
+# A fiscal year in a column header: 2023, FY 2023-24, 31.03.2024, 2079/80
+YEAR_PATTERN = re.compile(r'(?<![\d,])((?:19|20)\d{2})(?![\d,])')
 
-    Args:
-        file_object (BytesIO): The in-memory uploaded PDF file.
-        file_name (str): The base filename (without extension) to use for saving.
+# Non-year captions a header row may carry next to its year columns
+HEADER_CAPTION = re.compile(r'(?i)^\s*(?:notes?|sch(?:edule)?|ref|particulars|amount.*|(?:rs|npr|inr)\.?|fy)\s*\.?\s*$')
 
-    Creates:
-        - A Markdown file saved as temp/<file_name>.md
-    """
-    try:
-        # Ensure TEMP_FOLDER exists
-        os.makedirs(TEMP_FOLDER, exist_ok=True)
-        logger.info("Temp Folder exists.")
+# Label cells of a header row: captions and statement titles ("Balance Sheet as at ...")
+HEADER_LABEL = re.compile(r'(?i)particulars|description|^\s*(?:heads?|items?|amount)\b|as (?:at|on)\b|'
+                          r'(?:year|period) end|statement|balance sheet|profit (?:and|&) loss|\b(?:rs|npr|inr)\b')
 
-        # Build full path using original filename
-        temp_pdf_path = os.path.join(TEMP_FOLDER, f"{file_name}.pdf")
-        logger.info(temp_pdf_path)
+PROJECTED_HINT = re.compile(r'(?i)project|forecast|estimat|budget')
+AUDITED_HINT = re.compile(r'(?i)audit|actual')
 
-        # Write the in-memory PDF to disk with original name
-        with open(temp_pdf_path, "wb") as file:
-            file.write(file_object.read())
+def convert_pdf_bytes(pdf_bytes, file_name:str="document", pages=None, parallel=None):
+    """
+    Convert PDF bytes with Docling without writing anything to disk.
 
-        # Convert to markdown using Docling
-        converter = DocumentConverter()
-        doc = converter.convert(temp_pdf_path).document
+    Args:
+        pdf_bytes (bytes): Raw bytes of the uploaded PDF.
+        file_name (str): Name reported to Docling for the in-memory stream.
+        pages (list of int, optional): Sorted 1-based pages to convert (e.g. chosen
+            by utils.page_triage). Defaults to every page.
+        parallel (bool, optional): Convert page ranges in a process pool. By default
+            this is decided from the page count (see utils.parallel_convert).
 
-        # Build markdown path
-        md_path = os.path.join(TEMP_FOLDER, f"{file_name}.md")
+    Returns:
+        list: One DoclingDocument per converted page range, in page order.
+    """
+    if pages is None:
+        pages = list(range(1, parallel_convert.count_pages(pdf_bytes) + 1))
 
-        # Saving the markdown file 
-        with open(md_path, "w", encoding="utf-8") as file:
-            file.write(doc.export_to_markdown())
+    if parallel is None:
+        parallel = parallel_convert.should_split(len(pages))
 
-        # # Delete the Temporary PDF
-        # os.remove(temp_pdf_path)
+    if parallel:
+        # Long reports: page ranges converted across cores, returned in page order
+        return parallel_convert.convert_pdf_parallel(pdf_bytes, file_name, pages=pages)
 
-        logger.info(f"Markdown successfully saved to: {md_path}")
-        logger.info("TODO: PDF removal pending!")
+    # Convert using a pre-warmed converter from the shared pool
+    with converter_pool.acquire_converter() as converter:
+        return [converter.convert(parallel_convert.document_stream(pdf_bytes, file_name), page_range=page_range).document
+                for page_range in page_triage.pages_to_ranges(pages)]
 
-    except Exception as e:
-        logger.error(f"Failed to convert PDF to Markdown!: {e}")
 
+def document_tables(documents):
+    """
+    Read every table straight from the Docling document model.
 
-# === On plan using vision Language model ===
+    Args:
+        documents (list): DoclingDocuments, in page order.
 
-# def pdf_eocr(source):
-# # Uncomment for only for GPU based systems
+    Returns:
+        list: One entry per table, each a list of rows of cell text.
+    """
+    tables = []
+    for doc in documents:
+        for table in doc.tables:
+            rows = [[" ".join(cell.text.split()) for cell in row] for row in table.data.grid]
+            rows = [row for row in rows if any(row)]
+            if rows:
+                tables.append(rows)
 
-#     # print("Pytorch version:", torch.__version__)
-#     # print("CUDA available:", torch.cuda.is_available())
-#     # if torch.cuda.is_available():
-#     #     print("GPU name:", torch.cuda.get_device_name(0))
+    logger.info(f"Read {len(tables)} tables from the Docling document.")
+    return tables
 
-# # Works for CPU based systems
-#     # Convert PDF to list of images (each page = one image)
-#     images = convert_from_path(source, poppler_path=r"C:\poppler-24.08.0\Library\bin")
 
-#     # To use the gpu set gpu=True
-#     reader = easyocr.Reader(['en'], gpu=True)
+def tables_to_markdown(tables):
+    """Render extracted tables as markdown, for people who want to inspect them."""
+    blocks = []
+    for rows in tables:
+        width = max(len(row) for row in rows)
+        lines = ["| " + " | ".join(cell.replace("|", "\\|") for cell in row + [""] * (width - len(row))) + " |"
+                 for row in rows]
+        lines.insert(1, "|" + "---|" * width)
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
 
-#     source = source.split("/")[-1].split(".")[0]
 
-#     for i, img in enumerate(images):
-#         print(f"Processing Page {1}")
-#         result = reader.readtext(np.array(img))
-#         with open(f"{source}.md", "w") as file:
-#             for detection in result:
-#                 bbox, text, confidence = detection
-#                 file.write(text)
-#                 print(f    """
+def documents_to_markdown(documents):
+    """Export converted documents to a single markdown string, in page order."""
+    return "\n\n".join(doc.export_to_markdown() for doc in documents)
 
 
-def parse_markdown(file_path):
-    try:
-        path = Path(file_path)
-        if not path.is_file():
-            logger.warning(f"Markdown file not found: {file_path}")
-            return []
-
-        lines = path.read_text(encoding='utf-8').splitlines()
-        table_lines = [line for line in lines if re.match(r'^\s*\|.*\|\s*$', line) and not re.match(r'^\s*\|?[\s\-|]+\|?\s*$', line)]
-        logger.info(f"Parsed {len(table_lines)} table lines from markdown.")
-        return table_lines
-    
-    except Exception as e:
-        logger.error(f"[parse_markdown] Error parsing markdown file: {e}")
-        return []
-
-
-def check_years(header, year1, year2):
+def pdf_to_md(file_object, file_name:str, parallel=None, pages=None, folder=TEMP_FOLDER):
     """
-    Identify the column indices of the two given years from the table header.
-    Returns the years in chronological order and a mapping of year → column index.
+    Convert an uploaded PDF file (as BytesIO) into a markdown file using Docling.
 
     Args:
-        header (list of str): List of header columns from the markdown table.
-        year1 (int): First year to search for.
-        year2 (int): Second year to search for.
+        file_object (BytesIO): The in-memory uploaded PDF file.
+        file_name (str): The base filename (without extension) to use for saving.
+        parallel (bool, optional): See convert_pdf_bytes().
+        pages (list of int, optional): See convert_pdf_bytes().
+        folder (str): Where to save the markdown; pass the same folder to
+            extract_data_to_dict(). Use a folder from workspace.job_workspace() to keep
+            concurrent jobs apart.
 
-    Returns:
-        tuple: (current_year, projected_year, year_index)
-            - current_year (int): The earlier year
-            - projected_year (int): The later year
-            - year_index (dict): Mapping of year → index in header
+    Creates:
+        - A Markdown file saved as <folder>/<file_name>.md
 
-    Raises:
-        ValueError: If one or both years are not found in the header
+    Returns:
+        str or None: The exported markdown, or None if conversion failed.
     """
     try:
-        # Initialize year to column index mapping
-        year_index = {}
-
-        # Map each target year to its position in the header row
-        for idx, col in enumerate(header):
-            if str(year1) in col:
-                year_index[year1] = idx
-            elif str(year2) in col:
-                year_index[year2] = idx 
-
-        logger.info(f"Year index mapping found: {year_index}")
-
-        # Handle missing years
-        year_index_keys = list(year_index.keys())
-        if len(year_index_keys) == 0:
-            logger.error("Neither years were found in the header.")
-            raise ValueError("No matching years found in header.")
-        if len(year_index_keys) == 1:
-            logger.error(f"Only one year found: {year_index_keys[0]}")
-            raise ValueError("Only one year found in header.")
-        
-        # Return years in chronological order
-        if len(year_index_keys) >=2:
-            if year1 < year2:
-                current_year , projected_year = year1, year2
-            else:
-                current_year, projected_year = year2, year1        
-
-        logger.info(f"Years identified: Current = {current_year}, Projected = {projected_year}")
-
-        return current_year, projected_year, year_index    
-    
-    except Exception as e:
-        logger.error(f"Error processing years: {e}") 
-
+        documents = convert_pdf_bytes(file_object.getvalue(), file_name, pages=pages, parallel=parallel)
+        markdown = documents_to_markdown(documents)
+        save_markdown(file_name, markdown, folder)
+        return markdown
 
+    except Exception as e:
+        logger.error(f"Failed to convert PDF to Markdown!: {e}")
+        return None
 
-def load_field_mappings():
-    with open(f"{FINANCIAL_MAPPING}", "r") as file:
-        mapping_data = json.load(file)
-        
-    
-    logger.info("Field Mappings loaded!")
-    return mapping_data["field_mappings"]
 
-def create_alias_lookup(field_mappings):
-    alias_lookup = {}
-    for standard_field, aliases in field_mappings.items():
-        for alias in aliases:
-            alias_lookup[alias.strip().lower()] = standard_field
+def process_pdf_bytes(pdf_bytes, file_name:str="document", progress=None, parallel=None):
+    """
+    Run the whole pipeline in memory: page triage, Docling conversion and extraction.
 
-    logger.info("Aliases Created!")
-    return alias_lookup
+    Scanned pages (no text layer) are sent through the EasyOCR fallback in utils.ocr
+    when Docling's tables yield no data, whether or not triage selected them; the
+    text-layer pages never pay for OCR.
 
+    Args:
+        pdf_bytes (bytes): Raw bytes of the uploaded PDF.
+        file_name (str): Name reported to Docling for the in-memory stream.
+        progress (callable, optional): progress(fraction, message) hook.
+        parallel (bool, optional): See convert_pdf_bytes().
 
-def extract_data_to_dict(file_name):
-    
-    parsed_data = parse_markdown(f"{TEMP_FOLDER}{file_name}{MARKDOWN}")
+    Returns:
+        dict: {"data": extracted dict, "tables": list of tables, "unit": statement unit
+            (see utils.units), "triage": page triage report, "documents": DoclingDocuments
+            (for an on-demand markdown export)}
+    """
+    if progress is None:
+        progress = lambda fraction, message="": None
 
-    # Stores the table data in a list where each row is a list
-    table_data = [[cell.strip() for cell in re.findall(r'\|([^|]+)', data)] for data in parsed_data]
+    progress(0.05, "Selecting statement pages")
+    keywords = page_triage.build_keywords(load_field_mappings(), REQUIRED)
+    triage = page_triage.triage_pdf(pdf_bytes, keywords)
 
-    # Assigns the first row of the table data as header
-    header = table_data[0]
+    progress(0.1, "Converting PDF with Docling")
+    documents = convert_pdf_bytes(pdf_bytes, file_name, pages=triage["selected_pages"], parallel=parallel)
 
-    # Using regex to only keep year values in a list
-    years = re.findall(r'(\d{4})', ",".join(header))
+    progress(0.8, "Extracting financial data")
+    tables = document_tables(documents)
+    data = extract_data_from_tables(tables)
 
-    # Mapping the list values to integer
-    years = list(map(int, years))
+    # Scanned pages have no text to score, so triage rarely selects them in a mixed
+    # report: OCR every one of them, or the most relevant ones past ocr.OCR_MAX_PAGES
+    scanned_pages = triage["no_text_pages"]
+    if not data and scanned_pages:
+        progress(0.85, "Reading scanned pages with OCR")
+        try:
+            ocr_progress = lambda fraction, message="": progress(0.85 + 0.1 * fraction, message)
+            anchors = [page for page, score in enumerate(triage["scores"], start=1) if score > 0]
+            tables = tables + ocr.ocr_tables(pdf_bytes, scanned_pages, progress=ocr_progress,
+                                             keywords=keywords, anchors=anchors)
+            data = extract_data_from_tables(tables)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"OCR fallback failed: {e}")
 
-    # Assigning the largest and second largest value to year1 and year2
-    year1, year2 = heapq.nlargest(2, years)
+    # "Rs. in '000" and the like sit in the table headers or in headings above them
+    headings = [item.text for doc in documents for item in doc.texts]
+    unit = units.detect_unit([*units.table_header_texts(tables), *headings])
 
-    FIELD_MAPPINGS = load_field_mappings()
-    ALIAS_LOOKUP = create_alias_lookup(FIELD_MAPPINGS)
+    return {"data": data, "tables": tables, "unit": unit, "triage": triage, "documents": documents}
 
-    current_year, projected_year, year_index = check_years(header, year1, year2)
-    logger.info(f"Current: {current_year}, Projected: {projected_year}")
 
-    # Creating the result dictionary
-    result = {
-        f"current_{current_year}": {
-            #"year": current_year,
-            # "data": {}
-        },
+def pdf_to_data(file_object, file_name:str, progress=None, persist=PERSIST_OUTPUTS):
+    """
+    Convert an uploaded PDF into structured financial data, reusing cached results.
 
-        f"projected_{projected_year}": {
-            # "year": projected_year,
-            # "data": {}
-        }
-    }
+    The cache is keyed by the SHA-256 of the PDF bytes plus the converter and
+    mapping versions, so a repeat upload or a Streamlit rerun skips Docling.
 
-    # Fill data for each year
-    # Skips the header
-    for row in table_data[1:]:
-        if len(row) <= max(year_index.values()):
-            continue
+    Args:
+        file_object (BytesIO): The in-memory uploaded PDF file.
+        file_name (str): The base filename (without extension) to use for saving.
+        progress (callable, optional): progress(fraction, message) hook, used when
+            running as a background job (see utils.jobs).
+        persist (bool): Also write the markdown, JSON and page triage report to a job
+            folder under temp/jobs/ (see utils.workspace).
 
-        raw_label = row[0].strip().lower()
+    Returns:
+        ScaledData: Extracted data, keyed by period (e.g. current_2023, projected_2024),
+            with the detected statement unit and scale (see utils.units).
+    """
+    if progress is None:
+        progress = lambda fraction, message="": None
 
-        # First try exact match
-        standard_field = ALIAS_LOOKUP.get(raw_label)
-
-        # If no exact match, do partial match
-        if not standard_field:
-            for alias, field in ALIAS_LOOKUP.items():
-                if alias in raw_label:
-                    standard_field = field
-                    break
-        
-        if not standard_field:
-            logger.info(f"Unmatched label: '{raw_label}'")
-            continue
+    pdf_bytes = file_object.getvalue()
+    cache_key = conversion_cache.make_key(pdf_bytes)
 
-        if standard_field.strip().lower() not in normalized_required:
-            logger.info(f"Skipping non-required field: '{standard_field}'")
-            continue
+    progress(0.05, "Checking conversion cache")
+    cached = conversion_cache.get(cache_key)
+    if cached is not None:
+        unit = cached.get("unit", "Rupees")
+        return units.ScaledData(cached["data"], units.SCALES[unit], unit)
 
-        current_value = row[year_index[current_year]]
-        projected_value = row[year_index[projected_year]]
+    result = process_pdf_bytes(pdf_bytes, file_name, progress=progress)
 
+    if persist:
         try:
-            # Clean and convert values
-            if "(" in current_value or "(" in projected_value:
-                current_value = float(current_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                projected_value = float(projected_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-
-                result[f"current_{current_year}"][standard_field] = round(-current_value, 2)
-                result[f"projected_{projected_year}"][standard_field] = round(-projected_value, 2)
-            
-            else:
-                current_value = float(current_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                projected_value = float(projected_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                result[f"current_{current_year}"][standard_field] = round(current_value, 2)
-                result[f"projected_{projected_year}"][standard_field] = round(projected_value, 2)
-                        
-        except ValueError:
-            continue        
-                    
-    return result            
-    # print(result)
-
-def extract_dict_to_json(file_name):
-    data = extract_data_to_dict(file_name)
-    if data:
-        json_path = os.path.join(TEMP_FOLDER, f"{file_name}.json")
-        with open(json_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
+            with workspace.job_workspace(file_name) as job_dir:
+                save_markdown(file_name, documents_to_markdown(result["documents"]), job_dir)
+                extract_dict_to_json(file_name, result["data"], job_dir)
+                save_triage_report(file_name, result["triage"], job_dir)
+        except Exception as e:
+            # The artifacts are for auditing only, the extraction itself succeeded
+            logger.error(f"Failed to save job artifacts for {file_name}: {e}")
 
+    # Only cache successful conversions
+    if result["data"]:
+        conversion_cache.put(cache_key, result["tables"], result["data"], triage=result["triage"],
+                             pdf_sha256=hashlib.sha256(pdf_bytes).hexdigest(), file_name=file_name,
+                             unit=result["unit"])
 
-def extract_year_from_key(key):
-    """Extract year from a key like 'audited-2023' or 'projected-2025'."""
-    match = re.search(r'(\d{4})', key)
-    if match:
-        return int(match.group(1))
-    return 0
+    return units.ScaledData(result["data"], units.SCALES[result["unit"]], result["unit"])
 
 
-def is_audited(key):
-    """
-    Check if a key represents audited data.
-    AUDIT or Current
+def cached_markdown(pdf_bytes):
     """
-    audited = key.lower().startswith('audit')
-    if not audited:
-        audited = key.lower().startswith('current')
-
-    return audited
+    Render the tables extracted from a previously converted PDF as markdown.
 
+    Returns:
+        str or None: Markdown, or None if the PDF is not in the conversion cache.
+    """
+    cached = conversion_cache.get(conversion_cache.make_key(pdf_bytes))
+    if cached is None:
+        return None
+    return tables_to_markdown(cached["tables"])
 
-def is_projected(key):
-    """Check if a key represents projected data. Project or Current """
 
-    projected = key.lower().startswith('project')
-    if not projected:
-        projected = key.lower().startswith('previous')
+def save_markdown(file_name, markdown, folder=TEMP_FOLDER):
+    """Save markdown as <folder>/<file_name>.md."""
+    os.makedirs(folder, exist_ok=True)
+    md_path = os.path.join(folder, f"{file_name}{MARKDOWN}")
+    with open(md_path, "w", encoding="utf-8") as file:
+        file.write(markdown)
+    logger.info(f"Markdown successfully saved to: {md_path}")
 
-    return projected
 
+def save_triage_report(file_name, triage, folder=TEMP_FOLDER):
+    """Save the page triage report as <folder>/<file_name>.pages.json so skipped pages can be audited."""
+    try:
+        os.makedirs(folder, exist_ok=True)
+        report_path = os.path.join(folder, f"{file_name}.pages.json")
+        with open(report_path, "w", encoding="utf-8") as file:
+            json.dump(triage, file, indent=4)
+    except OSError as e:
+        logger.error(f"Failed to save page triage report: {e}")
 
-def check_years(header, year1, year2):
-    """
-    Identify the column indices of the two given years from the table header.
-    Returns the years in chronological order and a mapping of year → column index.
 
-    Args:
-        header (list of str): List of header columns from the markdown table.
-        year1 (int): First year to search for.
-        year2 (int): Second year to search for.
+def parse_markdown_text(markdown):
+    """Return the table rows of a markdown string, skipping separator rows."""
+    lines = markdown.splitlines()
+    table_lines = [line for line in lines if re.match(r'^\s*\|.*\|\s*$', line) and not re.match(r'^\s*\|?[\s\-|]+\|?\s*$', line)]
+    logger.info(f"Parsed {len(table_lines)} table lines from markdown.")
+    return table_lines
 
-    Returns:
-        tuple: (current_year, projected_year, year_index)
-            - current_year (int): The earlier year
-            - projected_year (int): The later year
-            - year_index (dict): Mapping of year → index in header
 
-    Raises:
-        ValueError: If one or both years are not found in the header
-    """
+def parse_markdown(file_path):
     try:
-        # Initialize year to column index mapping
-        year_index = {}
-
-        # Map each target year to its position in the header row
-        for idx, col in enumerate(header):
-            if str(year1) in col:
-                year_index[year1] = idx
-            elif str(year2) in col:
-                year_index[year2] = idx 
-
-        logger.info(f"Year index mapping found: {year_index}")
-
-        # Handle missing years
-        year_index_keys = list(year_index.keys())
-        if len(year_index_keys) == 0:
-            logger.error("Neither years were found in the header.")
-            raise ValueError("No matching years found in header.")
-        if len(year_index_keys) == 1:
-            logger.error(f"Only one year found: {year_index_keys[0]}")
-            raise ValueError("Only one year found in header.")
-        
-        # Return years in chronological order
-        if len(year_index_keys) >=2:
-            if year1 < year2:
-                current_year , projected_year = year1, year2
-            else:
-                current_year, projected_year = year2, year1        
-
-        logger.info(f"Years identified: Current = {current_year}, Projected = {projected_year}")
-
-        return current_year, projected_year, year_index    
+        path = Path(file_path)
+        if not path.is_file():
+            logger.warning(f"Markdown file not found: {file_path}")
+            return []
+
+        return parse_markdown_text(path.read_text(encoding='utf-8'))
     
     except Exception as e:
-        logger.error(f"Error processing years: {e}") 
-
+        logger.error(f"[parse_markdown] Error parsing markdown file: {e}")
+        return []
 
 
 def load_field_mappings():
-    with open(f"{FINANCIAL_MAPPING}", "r") as file:
-        mapping_data = json.load(file)
-        
-    
-    logger.info("Field Mappings loaded!")
-    return mapping_data["field_mappings"]
+    """Field mappings from the shared registry (see utils.mappings)."""
+    return get_field_mappings()
 
-def create_alias_lookup(field_mappings):
-    alias_lookup = {}
-    for standard_field, aliases in field_mappings.items():
-        for alias in aliases:
-            alias_lookup[alias.strip().lower()] = standard_field
 
-    logger.info("Aliases Created!")
-    return alias_lookup
+def extract_data_to_dict(file_name, folder=TEMP_FOLDER):
+    # Reading a job folder counts as a use for workspace eviction
+    workspace.touch(folder)
+    return extract_data_from_lines(parse_markdown(os.path.join(folder, f"{file_name}{MARKDOWN}")))
 
 
-def extract_data_to_dict(file_name):
-    
-    parsed_data = parse_markdown(f"{TEMP_FOLDER}{file_name}{MARKDOWN}")
+def extract_data_from_lines(parsed_data):
+    """Extract data from markdown table lines, as returned by parse_markdown_text()."""
 
     # Stores the table data in a list where each row is a list
     table_data = [[cell.strip() for cell in re.findall(r'\|([^|]+)', data)] for data in parsed_data]
+    return extract_data_from_rows(table_data)
 
-    # Assigns the first row of the table data as header
-    header = table_data[0]
-
-    # Using regex to only keep year values in a list
-    years = re.findall(r'(\d{4})', ",".join(header))
 
-    # Mapping the list values to integer
-    years = list(map(int, years))
+def extract_data_from_rows(table_data):
+    """Extract data from a flat list of table rows; each year header row starts a new table."""
+    return extract_data_from_tables([table_data])
 
-    # Assigning the largest and second largest value to year1 and year2
-    year1, year2 = heapq.nlargest(2, years)
 
-    FIELD_MAPPINGS = load_field_mappings()
-    ALIAS_LOOKUP = create_alias_lookup(FIELD_MAPPINGS)
-
-    current_year, projected_year, year_index = check_years(header, year1, year2)
-    logger.info(f"Current: {current_year}, Projected: {projected_year}")
-
-    # Creating the result dictionary
-    result = {
-        f"current_{current_year}": {
-            #"year": current_year,
-            # "data": {}
-        },
-
-        f"projected_{projected_year}": {
-            # "year": projected_year,
-            # "data": {}
-        }
-    }
-
-    # Fill data for each year
-    # Skips the header
-    for row in table_data[1:]:
-        if len(row) <= max(year_index.values()):
-            continue
+def find_year_columns(row, alias_matcher=None):
+    """
+    Detect a header row and the fiscal year held by each of its columns.
 
-        raw_label = row[0].strip().lower()
+    Every non-empty value cell must be a year (2023, FY 2023-24, Audited 2023), a
+    period word (Audited, Projected) or a column caption such as "Note"; one amount
+    is enough to make it a data row. The label cell must be empty, a caption or a
+    statement title (HEADER_LABEL), or itself name a year or period, and must not
+    match an alias: "Depreciation | 2015 | 300" and "Some Unknown | 2015 | 2016"
+    are data rows.
 
-        # First try exact match
-        standard_field = ALIAS_LOOKUP.get(raw_label)
-
-        # If no exact match, do partial match
-        if not standard_field:
-            for alias, field in ALIAS_LOOKUP.items():
-                if alias in raw_label:
-                    standard_field = field
-                    break
-        
-        if not standard_field:
-            logger.info(f"Unmatched label: '{raw_label}'")
-            continue
+    Args:
+        row (list of str): Cell text, label column first.
+        alias_matcher (dict, optional): Compiled matcher from the mapping registry.
 
-        if standard_field.strip().lower() not in normalized_required:
-            logger.info(f"Skipping non-required field: '{standard_field}'")
+    Returns:
+        dict or None: column index -> (year, hint) where hint is "audited", "projected"
+            or None, or None if the row is not a year header.
+    """
+    label = row[0].strip() if row else ""
+    if label and not (HEADER_LABEL.search(label) or YEAR_PATTERN.search(label) or period_hint(label)):
+        return None
+    if alias_matcher is not None and label and match_label(alias_matcher, label.lower()):
+        return None
+
+    columns = {}
+    for idx, cell in enumerate(row[1:], start=1):
+        if not cell.strip():
             continue
+        match = YEAR_PATTERN.search(cell)
+        if not match:
+            if period_hint(cell) or HEADER_CAPTION.match(cell):
+                continue
+            return None
+        # An amount that merely contains 20xx (e.g. 2023.50) is not a year header
+        if parse_value(cell) is not None and cell.strip() != match.group(1):
+            return None
+        columns[idx] = (int(match.group(1)), period_hint(cell))
 
-        current_value = row[year_index[current_year]]
-        projected_value = row[year_index[projected_year]]
-
-        try:
-            # Clean and convert values
-            if "(" in current_value or "(" in projected_value:
-                current_value = float(current_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                projected_value = float(projected_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-
-                result[f"current_{current_year}"][standard_field] = round(-current_value, 2)
-                result[f"projected_{projected_year}"][standard_field] = round(-projected_value, 2)
-            
-            else:
-                current_value = float(current_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                projected_value = float(projected_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                result[f"current_{current_year}"][standard_field] = round(current_value, 2)
-                result[f"projected_{projected_year}"][standard_field] = round(projected_value, 2)
-                        
-        except ValueError:
-            continue        
-                    
-    return result            
-    # print(result)
-
-def extract_dict_to_json(file_name):
-    data = extract_data_to_dict(file_name)
-    if data:
-        json_path = os.path.join(TEMP_FOLDER, f"{file_name}.json")
-        with open(json_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
-
-
-def extract_year_from_key(key):
-    """Extract year from a key like 'audited-2023' or 'projected-2025'."""
-    match = re.search(r'(\d{4})', key)
-    if match:
-        return int(match.group(1))
-    return 0
+    return columns or None
 
 
-def is_audited(key):
-    """
-    Check if a key represents audited data.
-    AUDIT or Current
+def find_hint_row(row):
     """
-    audited = key.lower().startswith('audit')
-    if not audited:
-        audited = key.lower().startswith('current')
-
-    return audited
+    Detect a row such as "| | Audited | Audited | Projected |" above the year header.
 
+    Returns:
+        dict or None: column index -> "audited"/"projected", or None if not a hint row.
+    """
+    hints = {}
+    for idx, cell in enumerate(row[1:], start=1):
+        if not cell.strip():
+            continue
+        hint = period_hint(cell)
+        if hint is None or YEAR_PATTERN.search(cell):
+            return None
+        hints[idx] = hint
+    return hints or None
 
-def is_projected(key):
-    """Check if a key represents projected data. Project or Current """
 
-    projected = key.lower().startswith('project')
-    if not projected:
-        projected = key.lower().startswith('previous')
+def period_hint(text):
+    """Classify column header text as audited or projected, None if it does not say."""
+    if PROJECTED_HINT.search(text):
+        return "projected"
+    if AUDITED_HINT.search(text):
+        return "audited"
+    return None
 
-    return projected
 
+def period_keys(columns):
+    """
+    Name every (year, hint) period found in the document.
 
+    Hinted columns become audited_<year>/projected_<year>, and unhinted columns of a
+    year that is hinted elsewhere (e.g. a Balance Sheet without the P&L's "Audited"
+    row) join that period. Remaining years follow the original two-column convention:
+    the latest year is projected_<year> (when there is more than one year) and the
+    others are current_<year>. A document with no projected column at all
+    ("Audited 2023 | Audited 2022") keeps that convention too, its latest year becomes
+    projected_<year> so there is always a period to project from.
 
-def check_years(header, year1, year2):
+    Returns:
+        dict: (year, hint) -> period key, in chronological order.
+    """
+    hinted = {}
+    for year, hint in columns:
+        if hint:
+            hinted.setdefault(year, set()).add(hint)
+    years = sorted({year for year, _ in columns})
+
+    none_projected = not any("projected" in hints for hints in hinted.values())
+
+    keys = {}
+    for year, hint in sorted(columns, key=lambda column: (column[0], column[1] == "projected")):
+        label = hint
+        if label is None and year in hinted:
+            # Actuals win when a year is both audited and projected
+            label = "audited" if "audited" in hinted[year] else "projected"
+        elif label is None:
+            label = "current"
+        if none_projected and len(years) > 1 and year == years[-1]:
+            label = "projected"
+        keys[(year, hint)] = f"{label}_{year}"
+    return keys
+
+
+def layout_cell_class(cell):
+    """Classify a cell for the layout fingerprint: year header, period hint or other."""
+    if YEAR_PATTERN.search(cell):
+        return "y"
+    if period_hint(cell):
+        return "h"
+    return ""
+
+
+def plan_table(table, alias_matcher, fuzzy_index=None):
     """
-    Identify the column indices of the two given years from the table header.
-    Returns the years in chronological order and a mapping of year → column index.
+    Work out which rows of a table are hint rows, year headers and standard fields.
 
     Args:
-        header (list of str): List of header columns from the markdown table.
-        year1 (int): First year to search for.
-        year2 (int): Second year to search for.
+        table (list of list of str): Rows of cell text, label column first.
+        alias_matcher (dict): Compiled matcher from the mapping registry.
+        fuzzy_index (dict, optional): Trigram index used for labels no alias matches
+            (typos, plurals); None to drop those rows.
 
     Returns:
-        tuple: (current_year, projected_year, year_index)
-            - current_year (int): The earlier year
-            - projected_year (int): The later year
-            - year_index (dict): Mapping of year → index in header
-
-    Raises:
-        ValueError: If one or both years are not found in the header
+        list: [row index, kind, payload] entries. kind is "hints" or "header" with
+            [column index, hint] pairs as payload, or "field" with the standard field.
     """
-    try:
-        # Initialize year to column index mapping
-        year_index = {}
-
-        # Map each target year to its position in the header row
-        for idx, col in enumerate(header):
-            if str(year1) in col:
-                year_index[year1] = idx
-            elif str(year2) in col:
-                year_index[year2] = idx 
-
-        logger.info(f"Year index mapping found: {year_index}")
-
-        # Handle missing years
-        year_index_keys = list(year_index.keys())
-        if len(year_index_keys) == 0:
-            logger.error("Neither years were found in the header.")
-            raise ValueError("No matching years found in header.")
-        if len(year_index_keys) == 1:
-            logger.error(f"Only one year found: {year_index_keys[0]}")
-            raise ValueError("Only one year found in header.")
-        
-        # Return years in chronological order
-        if len(year_index_keys) >=2:
-            if year1 < year2:
-                current_year , projected_year = year1, year2
-            else:
-                current_year, projected_year = year2, year1        
-
-        logger.info(f"Years identified: Current = {current_year}, Projected = {projected_year}")
-
-        return current_year, projected_year, year_index    
-    
-    except Exception as e:
-        logger.error(f"Error processing years: {e}") 
-
-
-
-def load_field_mappings():
-    with open(f"{FINANCIAL_MAPPING}", "r") as file:
-        mapping_data = json.load(file)
-        
-    
-    logger.info("Field Mappings loaded!")
-    return mapping_data["field_mappings"]
-
-def create_alias_lookup(field_mappings):
-    alias_lookup = {}
-    for standard_field, aliases in field_mappings.items():
-        for alias in aliases:
-            alias_lookup[alias.strip().lower()] = standard_field
-
-    logger.info("Aliases Created!")
-    return alias_lookup
+    plan = []
+    for row_idx, row in enumerate(table):
+        hints = find_hint_row(row)
+        if hints:
+            plan.append([row_idx, "hints", sorted(hints.items())])
+            continue
 
+        header = find_year_columns(row, alias_matcher)
+        if header:
+            # Only the column positions are kept, years are read from the cells
+            plan.append([row_idx, "header", [[idx, hint] for idx, (_, hint) in sorted(header.items())]])
+            continue
 
-def extract_data_to_dict(file_name):
-    
-    parsed_data = parse_markdown(f"{TEMP_FOLDER}{file_name}{MARKDOWN}")
+        if not row:
+            continue
 
-    # Stores the table data in a list where each row is a list
-    table_data = [[cell.strip() for cell in re.findall(r'\|([^|]+)', data)] for data in parsed_data]
+        raw_label = row[0].strip().lower()
 
-    # Assigns the first row of the table data as header
-    header = table_data[0]
+        # Exact match, otherwise the longest alias contained in the label
+        match = match_label(alias_matcher, raw_label)
 
-    # Using regex to only keep year values in a list
-    years = re.findall(r'(\d{4})', ",".join(header))
+        if not match and fuzzy_index is not None:
+            match = fuzzy_match(fuzzy_index, raw_label)
+            if match:
+                logger.info(f"Fuzzy matched label: '{raw_label}' -> '{match[0]}' (alias '{match[1]}', score {match[2]})")
 
-    # Mapping the list values to integer
-    years = list(map(int, years))
+        if not match:
+            logger.info(f"Unmatched label: '{raw_label}'")
+            continue
+        standard_field = match[0]
 
-    # Assigning the largest and second largest value to year1 and year2
-    year1, year2 = heapq.nlargest(2, years)
+        if standard_field.strip().lower() not in normalized_required:
+            logger.info(f"Skipping non-required field: '{standard_field}'")
+            continue
 
-    FIELD_MAPPINGS = load_field_mappings()
-    ALIAS_LOOKUP = create_alias_lookup(FIELD_MAPPINGS)
+        plan.append([row_idx, "field", standard_field])
+    return plan
 
-    current_year, projected_year, year_index = check_years(header, year1, year2)
-    logger.info(f"Current: {current_year}, Projected: {projected_year}")
 
-    # Creating the result dictionary
-    result = {
-        f"current_{current_year}": {
-            #"year": current_year,
-            # "data": {}
-        },
+def extract_data_from_tables(tables):
+    """
+    Map every table's rows onto the standard fields for all fiscal periods in one pass.
 
-        f"projected_{projected_year}": {
-            # "year": projected_year,
-            # "data": {}
-        }
-    }
+    Each table (e.g. separate Balance Sheet and P&L tables) gets its own year header,
+    so three to five audited and projected columns are all kept. A table without a
+    header continues the previous table's columns (statements split over pages).
 
-    # Fill data for each year
-    # Skips the header
-    for row in table_data[1:]:
-        if len(row) <= max(year_index.values()):
-            continue
+    Label matching is skipped for layouts seen before: the row/column plan of each
+    table is remembered by its layout fingerprint (see utils.layout_cache).
 
-        raw_label = row[0].strip().lower()
+    Args:
+        tables (list): Tables as lists of rows of cell text (see document_tables()).
 
-        # First try exact match
-        standard_field = ALIAS_LOOKUP.get(raw_label)
-
-        # If no exact match, do partial match
-        if not standard_field:
-            for alias, field in ALIAS_LOOKUP.items():
-                if alias in raw_label:
-                    standard_field = field
-                    break
-        
-        if not standard_field:
-            logger.info(f"Unmatched label: '{raw_label}'")
+    Returns:
+        dict: period key (e.g. audited_2023, projected_2025) -> {standard field: value}
+    """
+    # Compiled once per mapping file version by the registry
+    ALIAS_MATCHER = get_alias_matcher()
+    FUZZY_INDEX = get_fuzzy_index() if FUZZY_ENABLED else None
+
+    entries = []        # (year, hint, standard field, cell) in document order
+    seen_columns = set()
+    year_columns = None
+    layout_hits = 0
+
+    for table in tables:
+        layout_key = layout_cache.fingerprint(table, layout_cell_class)
+        plan = layout_cache.get(layout_key)
+        if plan is None:
+            plan = plan_table(table, ALIAS_MATCHER, FUZZY_INDEX)
+            layout_cache.put(layout_key, plan)
+        else:
+            layout_hits += 1
+
+        table_columns = None
+        pending_hints = {}
+        for row_idx, kind, payload in plan:
+            row = table[row_idx]
+            if kind == "hints":
+                pending_hints = dict(payload)
+                continue
+
+            if kind == "header":
+                # Headers split over two rows: take the hint from the row above
+                header = {idx: (int(YEAR_PATTERN.search(row[idx]).group(1)), hint or pending_hints.get(idx))
+                          for idx, hint in payload}
+                table_columns = year_columns = header
+                seen_columns.update(header.values())
+                continue
+
+            # Rows above the first header of the document carry no period
+            columns = table_columns or year_columns
+            if not columns:
+                continue
+
+            for idx, (year, hint) in columns.items():
+                if idx < len(row):
+                    entries.append((year, hint, payload, row[idx]))
+
+    layout_cache.flush()
+    logger.info(f"Layout cache: {layout_hits}/{len(tables)} tables matched a known layout "
+                f"(hit rate {layout_cache.stats()['hit_rate']:.0%} since start).")
+
+    if not seen_columns:
+        logger.error("No year header found in any table.")
+        return {}
+
+    keys = period_keys(seen_columns)
+    result = {key: {} for key in keys.values()}
+    logger.info(f"Periods found: {list(result)}")
+
+    # Every cell of the document is parsed in one batch
+    values, unparsed = parse_values([cell for *_, cell in entries])
+    for (year, hint, standard_field, cell), value, failed in zip(entries, values, unparsed):
+        if failed:
+            logger.info(f"Unparseable value for '{standard_field}' ({year}): '{cell}'")
             continue
+        # Later rows win, as before
+        result[keys[(year, hint)]][standard_field] = round(float(value), 2)
 
-        if standard_field.strip().lower() not in normalized_required:
-            logger.info(f"Skipping non-required field: '{standard_field}'")
-            continue
+    return result
 
-        current_value = row[year_index[current_year]]
-        projected_value = row[year_index[projected_year]]
 
-        try:
-            # Clean and convert values
-            if "(" in current_value or "(" in projected_value:
-                current_value = float(current_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                projected_value = float(projected_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-
-                result[f"current_{current_year}"][standard_field] = round(-current_value, 2)
-                result[f"projected_{projected_year}"][standard_field] = round(-projected_value, 2)
-            
-            else:
-                current_value = float(current_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                projected_value = float(projected_value.replace('(', '').replace(')', '').replace('$', '').replace(',', '').strip())
-                result[f"current_{current_year}"][standard_field] = round(current_value, 2)
-                result[f"projected_{projected_year}"][standard_field] = round(projected_value, 2)
-                        
-        except ValueError:
-            continue        
-                    
-    return result            
-    # print(result)
-
-def extract_dict_to_json(file_name):
-    data = extract_data_to_dict(file_name)
+def extract_dict_to_json(file_name, data=None, folder=TEMP_FOLDER):
+    """Save extracted data as <folder>/<file_name>.json, extracting it first if not given."""
+    if data is None:
+        data = extract_data_to_dict(file_name, folder)
     if data:
-        json_path = os.path.join(TEMP_FOLDER, f"{file_name}.json")
+        json_path = os.path.join(folder, f"{file_name}.json")
         with open(json_path, "w", encoding="utf-8") as file:
             json.dump(data, file, indent=4)
 
@@ -731,5 +632,3 @@ def is_projected(key):
         projected = key.lower().startswith('previous')
 
     return projected
-
-
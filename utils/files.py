@@ -0,0 +1,34 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_open(path, encoding="utf-8"):
+    """
+    Open a temporary file next to path for writing; it replaces path on success.
+
+    Readers never see a half-written file. The temporary file comes from
+    tempfile.mkstemp() in the same folder, so concurrent writers (batch processes or
+    job threads storing the same key) never share it. On error it is removed and
+    path is left as it was.
+
+    Args:
+        path (str): File to write.
+        encoding (str): Text encoding.
+
+    Yields:
+        file: Text file object to write to.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                    prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as file:
+            yield file
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,162 @@
+import heapq
+import os
+import re
+from difflib import SequenceMatcher
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Set FUZZY_MATCHING=0 to drop labels that match no alias exactly or as a substring
+FUZZY_ENABLED = os.environ.get("FUZZY_MATCHING", "1") == "1"
+
+# Minimum trigram Dice similarity to accept a field
+FUZZY_THRESHOLD = float(os.environ.get("FUZZY_MATCH_THRESHOLD", "0.8"))
+
+# The winner must beat the best alias of any other field by this much
+AMBIGUITY_MARGIN = 0.05
+
+# Words must pair up one to one, equal or at least this similar (typos, plurals)
+WORD_SIMILARITY = 0.75
+STOPWORDS = {"and", "&", "of", "the", "for", "to"}
+
+# Work bounds per label: posting entries visited, candidates re-scored on their full
+# trigram sets, candidates verified word by word, and label length considered
+MAX_POSTINGS = 1000
+MAX_RESCORED = 20
+MAX_VERIFIED = 5
+MAX_LABEL_CHARS = 120
+MIN_ALIAS_CHARS = 4
+
+# Note references "(note 12)", numbering and punctuation are not part of a label's meaning
+PARENTHESES = re.compile(r"\([^)]*\)")
+NON_LETTERS = re.compile(r"[^a-z&]+")
+
+
+def normalize_label(text):
+    """Lower-case, drop parentheticals, digits and punctuation, collapse spaces."""
+    text = PARENTHESES.sub(" ", text.lower())
+    return " ".join(NON_LETTERS.sub(" ", text).split())
+
+
+def trigrams(text):
+    """Character trigrams of a normalised label, padded so word starts and ends count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def words_agree(label, alias):
+    """
+    True if every significant word of the label pairs with one of the alias and none
+    is left over, so "total non current assets" never passes for "total current assets".
+    """
+    label_words = [word for word in label.split() if word not in STOPWORDS]
+    alias_words = [word for word in alias.split() if word not in STOPWORDS]
+    if len(label_words) != len(alias_words):
+        return False
+
+    for word in label_words:
+        for i, candidate in enumerate(alias_words):
+            if word == candidate or SequenceMatcher(None, word, candidate).ratio() >= WORD_SIMILARITY:
+                del alias_words[i]
+                break
+        else:
+            return False
+    return True
+
+
+def build_fuzzy_index(alias_lookup):
+    """
+    Build a character-trigram inverted index over every alias.
+
+    Args:
+        alias_lookup (dict): Lower-cased alias -> standard field (see create_alias_lookup()).
+
+    Returns:
+        dict: "postings" (trigram -> alias ids), per alias id "aliases", "fields" and
+            "grams" (trigram set), and "normalized" (normalised alias -> id).
+    """
+    index = {"postings": {}, "aliases": [], "fields": [], "grams": [], "normalized": {}}
+    for alias, field in alias_lookup.items():
+        normalized = normalize_label(alias)
+        if len(normalized) < MIN_ALIAS_CHARS or normalized in index["normalized"]:
+            continue
+        alias_id = len(index["aliases"])
+        grams = trigrams(normalized)
+        index["aliases"].append(alias)
+        index["fields"].append(field)
+        index["grams"].append(frozenset(grams))
+        index["normalized"][normalized] = alias_id
+        for gram in grams:
+            index["postings"].setdefault(gram, []).append(alias_id)
+
+    logger.info(f"Fuzzy index built: {len(index['aliases'])} aliases, {len(index['postings'])} trigrams.")
+    return index
+
+
+def fuzzy_match(index, raw_label, threshold=FUZZY_THRESHOLD):
+    """
+    Find the standard field for a label that no alias matches exactly, e.g. a typo
+    ("total curent assets") or a reworded alias.
+
+    Candidates come only from the index. Trigrams are visited rarest first and the
+    scan stops after MAX_POSTINGS posting entries; the shared-trigram counts so far
+    only rank candidates. The best MAX_RESCORED are scored on their full trigram sets
+    and at most MAX_VERIFIED of those are checked word by word (words_agree()), so
+    the work per label is bounded whatever the size of the mapping file.
+
+    The bound has a price on large mapping files: once a label's trigrams are common
+    to more than MAX_POSTINGS aliases, the right alias may never be counted and the
+    label stays unmatched (see benchmarks/bench_fuzzy_matching.py).
+
+    Args:
+        index (dict): Output of build_fuzzy_index().
+        raw_label (str): Row label.
+        threshold (float): Minimum Dice similarity between the label's and the alias's
+            trigram sets.
+
+    Returns:
+        tuple or None: (standard_field, alias, score), or None if no alias is similar
+            enough or two fields are too close to call.
+    """
+    normalized = normalize_label(raw_label)
+    if len(normalized) < MIN_ALIAS_CHARS or len(normalized) > MAX_LABEL_CHARS:
+        return None
+
+    alias_id = index["normalized"].get(normalized)
+    if alias_id is not None:
+        return index["fields"][alias_id], index["aliases"][alias_id], 1.0
+
+    grams = trigrams(normalized)
+    postings = index["postings"]
+    budget = MAX_POSTINGS
+    shared = {}
+    for gram in sorted((gram for gram in grams if gram in postings), key=lambda gram: len(postings[gram])):
+        alias_ids = postings[gram]
+        if len(alias_ids) > budget:
+            break
+        budget -= len(alias_ids)
+        for alias_id in alias_ids:
+            shared[alias_id] = shared.get(alias_id, 0) + 1
+
+    # Rank by the (possibly truncated) counts, then score the leaders on full sets
+    fields, alias_grams, aliases = index["fields"], index["grams"], index["aliases"]
+    leaders = heapq.nlargest(MAX_RESCORED, shared, key=shared.get)
+    scored = sorted(((2 * len(grams & alias_grams[alias_id]) / (len(grams) + len(alias_grams[alias_id])), alias_id)
+                     for alias_id in leaders), reverse=True)
+
+    # Verify the best scoring aliases word by word, then keep the best per field
+    best = {}
+    for score, alias_id in scored[:MAX_VERIFIED]:
+        if score < threshold:
+            break
+        field = fields[alias_id]
+        if field not in best and words_agree(normalized, normalize_label(aliases[alias_id])):
+            best[field] = (score, alias_id)
+
+    if not best:
+        return None
+    ranked = sorted(best.values(), reverse=True)
+    score, alias_id = ranked[0]
+    if len(ranked) > 1 and score - ranked[1][0] < AMBIGUITY_MARGIN:
+        return None
+    return fields[alias_id], aliases[alias_id], round(score, 3)
@@ -1,6 +1,7 @@
-import os
-import json
+from bisect import bisect_right
+import numpy as np
 import pandas as pd
+from .mappings import MAPPING_PATH, get_field_mappings
 
 
 # Benchmark standards for ratios
@@ -44,67 +45,205 @@ STANDARDS = {
 
 # Load the config file
 def load_config():
-    config_path = "financial_mappings.json"  # Path JSON file
-    if os.path.exists(config_path):
-        with open(config_path, "r") as f:
-            return json.load(f)["field_mappings"]
+    if MAPPING_PATH.exists():
+        return get_field_mappings()
     else:
         return "Config file not found"
 
-# Initialize field mappings
+# Field mappings as loaded at import. Prefer get_field_mappings(), which picks up edits
+# to financial_mappings.json without a restart.
 FIELD_MAPPINGS = load_config()    
     
+INVALID_STATUS = ("Invalid", "Unable to calculate ratio", "red")
+UNKNOWN_STATUS = ("Unknown", "Unable to determine status", "gray")
+
+
+def compile_standards(standards):
+    """
+    Compile each ratio's bands into sorted breakpoints for bisection.
+
+    Bands may overlap (ICR "strong" is 1 and up, "high" 1.5 and up). Where they do,
+    the band listed first wins, exactly as the former linear scan did, so every
+    value keeps its status.
+
+    Args:
+        standards (dict): Ratio -> category -> {"min", "max", "message", "color"}.
+
+    Returns:
+        dict: Ratio -> (breakpoints, statuses). For a value v,
+            statuses[bisect_right(breakpoints, v)] is its (category, message, color),
+            UNKNOWN_STATUS outside every band.
+    """
+    compiled = {}
+    for ratio_type, bands in standards.items():
+        breakpoints = sorted({edge for criteria in bands.values() for edge in (criteria["min"], criteria["max"])})
+        statuses = [UNKNOWN_STATUS]
+        # One status per interval [breakpoints[i], breakpoints[i + 1])
+        for low, high in zip(breakpoints, breakpoints[1:]):
+            # First band in listed order that covers the interval
+            covering = next(((category, criteria) for category, criteria in bands.items()
+                             if criteria["min"] <= low and high <= criteria["max"]), None)
+            if covering:
+                category, criteria = covering
+                statuses.append((category, criteria["message"], criteria["color"]))
+            else:
+                statuses.append(UNKNOWN_STATUS)
+        statuses.append(UNKNOWN_STATUS)
+        compiled[ratio_type] = (breakpoints, statuses)
+    return compiled
+
+
+# Compiled once at import; call compile_standards() again if STANDARDS is edited at runtime
+STATUS_INDEX = compile_standards(STANDARDS)
+
+
 def get_status(ratio_type, value):
     """Determine status of ratio based on standards with range support."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        # Missing ratios and messages such as "Data is not complete"
+        return INVALID_STATUS
     if pd.isna(value):
-        return "Invalid", "Unable to calculate ratio", "red"
+        return INVALID_STATUS
         # return "Invalid", "Unable to calculate ratio (division by zero or missing data)", "gray"
-    
-    # Get standards for this ratio type
-    standards = STANDARDS[ratio_type]   # update with balancesheet and ratio formula.
-    
-    # Check each category's range
-    for category, criteria in standards.items():
-        if criteria["min"] <= value < criteria["max"]:
-            return category, criteria["message"], criteria["color"]
-    
-    # Default case (should not reach here if standards are properly defined)
-    return "Unknown", "Unable to determine status", "gray"
 
+    breakpoints, statuses = STATUS_INDEX[ratio_type]
+    return statuses[bisect_right(breakpoints, value)]
 
-def find_value(data, field_options):
+
+def get_statuses(ratio_type, values):
     """
-    Find value in data using various possible field names, with case-insensitive matching.
-    Prioritizes non-zero values when multiple field matches are found.
+    get_status() for a whole array of values in one np.searchsorted() call.
+
+    Args:
+        ratio_type (str): Key of STANDARDS.
+        values (array-like): Ratio values, NaN where the ratio could not be calculated.
+
+    Returns:
+        tuple: (categories, messages, colors) as object arrays shaped like values.
     """
-    # Create a case-insensitive and whitespace-normalized version of the data keys
-    normalized_data = {}
-    for key, value in data.items():
-        normalized_key = key.strip().lower()
-        normalized_data[normalized_key] = value
-    
-    found_value = 0
-    
+    values = np.asarray(values, dtype=float)
+    breakpoints, statuses = STATUS_INDEX[ratio_type]
+    indices = np.searchsorted(np.asarray(breakpoints, dtype=float), values, side="right")
+    # NaN sorts after every breakpoint, give it its own slot
+    table = np.array(statuses + [INVALID_STATUS], dtype=object)
+    indices[np.isnan(values)] = len(statuses)
+    return tuple(table[indices, column] for column in range(3))
+
+
+def _normalize_keys(data):
+    """Stripped, lower-cased key -> (original key, value); later keys win, as before."""
+    return {key.strip().lower(): (key, value) for key, value in data.items()}
+
+
+def _match_field(data, normalized_data, field_options):
+    """
+    The value of the first non-zero option, else the last zero found, else 0.
+
+    Returns:
+        tuple: (value, key of data that supplied it or None).
+    """
+    found_value, source = 0, None
+
     # Check for each field option with normalization
     for option in field_options:
         # Check direct match first
         if option in data:
             # If we find a non-zero value, return it immediately
             if data[option] != 0:
-                return data[option]
+                return data[option], option
             # Otherwise, record that we found a value (even if zero)
-            found_value = data[option]
-        
+            found_value, source = data[option], option
+
         # Check normalized match
         normalized_option = option.strip().lower()
         if normalized_option in normalized_data:
+            key, value = normalized_data[normalized_option]
             # If we find a non-zero value, return it immediately
-            if normalized_data[normalized_option] != 0:
-                return normalized_data[normalized_option]
+            if value != 0:
+                return value, key
             # Otherwise, record that we found a value (even if zero)
-            found_value = normalized_data[normalized_option]
-    
-    return found_value  # Return the found value (or 0 if nothing found)
+            found_value, source = value, key
+
+    return found_value, source
+
+
+def find_value(data, field_options):
+    """
+    Find value in data using various possible field names, with case-insensitive matching.
+    Prioritizes non-zero values when multiple field matches are found.
+
+    Normalizes the whole dict on every call; to read several fields of the same
+    period use resolve_fields() instead.
+    """
+    return _match_field(data, _normalize_keys(data), field_options)[0]
+
+
+class FieldRecord:
+    """
+    One period's standard field values, resolved once from the raw extracted dict.
+
+    Values sit in fixed slots (one per field, shared by every record built from the
+    same fields); record[field] reads a value and record.source(field) tells which
+    key of the raw data supplied it (None if the field was missing and read as 0).
+    """
+
+    __slots__ = ("slots", "values", "sources")
+
+    def __init__(self, slots, values, sources):
+        self.slots = slots
+        self.values = values
+        self.sources = sources
+
+    def __getitem__(self, field):
+        return self.values[self.slots[field]]
+
+    def __contains__(self, field):
+        return field in self.slots
+
+    def source(self, field):
+        return self.sources[self.slots[field]]
+
+    def __repr__(self):
+        return f"FieldRecord({dict(zip(self.slots, self.values))})"
+
+
+# Slot layout per tuple of fields, so records of the same fields share one dict
+_slot_layouts = {}
+
+
+def resolve_fields(data, field_mappings=None, fields=None):
+    """
+    Resolve every standard field of a period in one pass over the data.
+
+    Gives the same value per field as find_value(data, field_mappings[field]),
+    including the non-zero-over-zero priority, but normalizes the data once.
+
+    Args:
+        data (dict): Raw {field or alias: value} data of one period.
+        field_mappings (dict): Standard field -> aliases. Defaults to the loaded mappings.
+        fields (list): Standard fields to resolve, in slot order. Defaults to the keys
+            of field_mappings; a field without aliases resolves to 0.
+
+    Returns:
+        FieldRecord: Values and the data keys they came from.
+    """
+    if field_mappings is None:
+        field_mappings = get_field_mappings()
+    fields = tuple(field_mappings) if fields is None else tuple(fields)
+
+    slots = _slot_layouts.get(fields)
+    if slots is None:
+        slots = _slot_layouts.setdefault(fields, {field: i for i, field in enumerate(fields)})
+
+    normalized_data = _normalize_keys(data)
+    values, sources = [], []
+    for field in fields:
+        value, source = _match_field(data, normalized_data, field_mappings.get(field, ()))
+        values.append(value)
+        sources.append(source)
+    return FieldRecord(slots, values, sources)
 
 # Function to format a float value as Nepali currency
 def nepali_format(n):
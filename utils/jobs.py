@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Background workers shared by every Streamlit session in this process
+JOB_WORKERS = max(1, int(os.environ.get("JOB_WORKERS", "2")))
+
+# Threads cannot be killed: a cancelled or timed-out job only stops at its next
+# progress() call, and a Docling conversion can run until its own document timeout
+# (CONVERSION_TIMEOUT). Such abandoned jobs give their slot back at once, so they do
+# not block other sessions, but at most this many may still be running before new
+# jobs wait for them to wind down.
+MAX_ABANDONED = max(0, int(os.environ.get("JOB_MAX_ABANDONED", str(2 * JOB_WORKERS))))
+
+# Wall-clock limit for a running job (seconds). Kept above the Docling document
+# timeout so the converter normally gives up first and frees the worker.
+DEFAULT_TIMEOUT = float(os.environ.get("JOB_TIMEOUT", "360"))
+
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION = float(os.environ.get("JOB_RETENTION", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed out"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+_jobs = {}
+_queue = deque()
+# Threads holding a worker slot, and threads of abandoned jobs still winding down
+_threads = {"running": 0, "abandoned": 0}
+_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled or has run past its deadline."""
+
+
+def _progress_callback(job):
+    """Build the progress(fraction, message) callback handed to the job function."""
+    def progress(fraction, message=""):
+        if job["cancel_event"].is_set():
+            raise JobCancelled(job["status"])
+        if job["deadline"] is not None and time.time() > job["deadline"]:
+            _finish(job, TIMED_OUT, error=f"Timed out after {job['timeout']:.0f}s")
+            raise JobCancelled(TIMED_OUT)
+        with _lock:
+            job["progress"] = min(max(float(fraction), 0.0), 1.0)
+            job["message"] = message
+    return progress
+
+
+def _finish(job, status, result=None, error=None):
+    with _lock:
+        # The first terminal state wins (e.g. a timeout beats a late result)
+        if job["status"] not in ACTIVE_STATES:
+            return
+        job["status"] = status
+        job["result"] = result
+        job["error"] = error
+        job["finished"] = time.time()
+        if status == DONE:
+            job["progress"] = 1.0
+        # The thread may still be inside a long stage: free its slot for the next job
+        abandoned = status != DONE and job["thread"] == "running"
+        if abandoned:
+            _threads["running"] -= 1
+            _threads["abandoned"] += 1
+            job["thread"] = "abandoned"
+    if status != DONE:
+        job["cancel_event"].set()
+    logger.info(f"Job {job['id'][:12]} {status}" + (f": {error}" if error else ""))
+    if abandoned:
+        _dispatch()
+
+
+def _dispatch():
+    """Start queued jobs while a worker slot is free."""
+    starting = []
+    with _lock:
+        while (_queue and _threads["running"] < JOB_WORKERS
+               and _threads["running"] + _threads["abandoned"] < JOB_WORKERS + MAX_ABANDONED):
+            job = _queue.popleft()
+            # Cancelled while queued
+            if job["status"] != QUEUED:
+                job.pop("call", None)
+                continue
+            job["thread"] = "running"
+            _threads["running"] += 1
+            starting.append(job)
+    for job in starting:
+        threading.Thread(target=_run, args=(job,), name=f"job-{job['id'][:8]}", daemon=True).start()
+
+
+def _run(job):
+    func, args, kwargs = job.pop("call")
+    with _lock:
+        job["status"] = RUNNING
+        job["started"] = time.time()
+        if job["timeout"]:
+            job["deadline"] = job["started"] + job["timeout"]
+
+    try:
+        result = func(*args, progress=_progress_callback(job), **kwargs)
+        _finish(job, DONE, result=result)
+    except JobCancelled:
+        _finish(job, CANCELLED)
+    except Exception as e:
+        logger.error(f"Job {job['id'][:12]} failed: {e}")
+        _finish(job, FAILED, error=str(e))
+    finally:
+        with _lock:
+            _threads[job["thread"]] -= 1
+            job["thread"] = None
+        _dispatch()
+
+
+def _expire_overdue():
+    """Time out running jobs past their deadline, even when nobody polls them."""
+    now = time.time()
+    with _lock:
+        overdue = [job for job in _jobs.values()
+                   if job["status"] == RUNNING and job["deadline"] is not None and now > job["deadline"]]
+    for job in overdue:
+        _finish(job, TIMED_OUT, error=f"Timed out after {job['timeout']:.0f}s")
+
+
+def submit(func, *args, job_id=None, timeout=DEFAULT_TIMEOUT, resubmit=False, **kwargs):
+    """
+    Queue func(*args, progress=callback, **kwargs) on the background workers.
+
+    The job function should call progress(fraction, message) between stages; the
+    call raises JobCancelled once the job is cancelled or past its deadline. Jobs run
+    on at most JOB_WORKERS threads; see MAX_ABANDONED for jobs that stop late.
+
+    Args:
+        func (callable): Work to run, must accept a `progress` keyword argument.
+        job_id (str, optional): Stable id (e.g. content hash). A known job with the
+            same id is reused instead of being queued again.
+        timeout (float, optional): Seconds the job may run once started.
+        resubmit (bool): Queue again even if a finished job with this id exists
+            (e.g. to retry after a failure). Active jobs are never duplicated.
+
+    Returns:
+        str: The job id.
+    """
+    _prune()
+    _expire_overdue()
+    job_id = job_id or uuid.uuid4().hex
+
+    with _lock:
+        existing = _jobs.get(job_id)
+        if existing is not None and (existing["status"] in ACTIVE_STATES or not resubmit):
+            return job_id
+
+        job = {
+            "id": job_id,
+            "status": QUEUED,
+            "progress": 0.0,
+            "message": "Queued",
+            "result": None,
+            "error": None,
+            "timeout": timeout,
+            "deadline": None,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "cancel_event": threading.Event(),
+            "call": (func, args, kwargs),
+            "thread": None,
+        }
+        _jobs[job_id] = job
+        _queue.append(job)
+
+    logger.info(f"Job {job_id[:12]} queued.")
+    _dispatch()
+    return job_id
+
+
+def get_status(job_id):
+    """
+    Return a snapshot of a job, or None if the id is unknown.
+
+    Keys: id, status, progress, message, result, error, submitted, started, finished.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return None
+
+    # Enforce the deadline even when the job function is stuck inside a long stage
+    if job["status"] == RUNNING and job["deadline"] is not None and time.time() > job["deadline"]:
+        _finish(job, TIMED_OUT, error=f"Timed out after {job['timeout']:.0f}s")
+
+    with _lock:
+        return {key: value for key, value in job.items() if key not in ("cancel_event", "call", "thread")}
+
+
+def cancel(job_id):
+    """
+    Cancel a queued or running job.
+
+    Queued jobs never start. Running jobs stop at their next progress() call and
+    their result is discarded; their worker slot is free at once.
+
+    Returns:
+        bool: True if the job was active and is now cancelled.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None or job["status"] not in ACTIVE_STATES:
+        return False
+
+    _finish(job, CANCELLED)
+    return True
+
+
+def _prune():
+    """Forget finished jobs older than JOB_RETENTION."""
+    cutoff = time.time() - JOB_RETENTION
+    with _lock:
+        stale = [job_id for job_id, job in _jobs.items()
+                 if job["finished"] is not None and job["finished"] < cutoff]
+        for job_id in stale:
+            del _jobs[job_id]
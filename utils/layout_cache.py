@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from .files import atomic_open
+from .fuzzy_matcher import FUZZY_ENABLED, FUZZY_THRESHOLD
+from .logs import setup_logger
+from .mappings import mapping_version
+
+logger = setup_logger()
+
+# Plans live in an append-only JSONL journal: a version header line, then one
+# {"key", "plan"} line per layout. flush() appends only the new plans, so its cost
+# follows the documents just extracted, not the size of the cache; the journal is
+# rewritten (compacted) only past twice MAX_LAYOUTS lines or for a new version.
+LAYOUT_PATH = "cache/layouts.jsonl"
+
+# Bump whenever the structure or meaning of a plan changes (e.g. REQUIRED is edited)
+LAYOUT_VERSION = "4"
+
+# Distinct layouts kept, least recently used are dropped first
+MAX_LAYOUTS = int(os.environ.get("LAYOUT_CACHE_MAX", "5000"))
+
+# Digits and punctuation in labels vary between filings of the same format
+LABEL_NOISE = re.compile(r"[\d\W_]+")
+
+_lock = threading.Lock()
+_state = {
+    "version": None,
+    "plans": {},
+    "pending": {},      # plans not yet appended to the file
+    "lines": 0,         # plan lines in the file, compacted when far above MAX_LAYOUTS
+    "rewrite": False,   # the file is missing or belongs to another version
+    "hits": 0,
+    "misses": 0,
+}
+
+
+def _cache_version():
+    # Plans differ with fuzzy matching on or off, or at another threshold
+    fuzzy = f"fuzzy-{FUZZY_THRESHOLD}" if FUZZY_ENABLED else "exact"
+    return f"{LAYOUT_VERSION}/{mapping_version()}/{fuzzy}"
+
+
+def fingerprint(table, cell_class):
+    """
+    Fingerprint a table layout: its normalised label sequence and header shape.
+
+    Years and amounts are left out, so next year's statement from the same client
+    has the same fingerprint.
+
+    Args:
+        table (list of list of str): Rows of cell text, label column first.
+        cell_class (callable): cell text -> short class string ("y" for a year
+            header, "h" for an audited/projected hint, "" otherwise).
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    digest = hashlib.sha256()
+    for row in table:
+        label = LABEL_NOISE.sub(" ", row[0].lower()).strip() if row else ""
+        shape = "".join(cell_class(cell) or "." for cell in row[1:])
+        digest.update(f"{label}\x1f{shape}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_file(version):
+    """
+    Read the journal: a version header line, then one {"key", "plan"} line per layout.
+
+    Returns:
+        tuple: (plans, line count), or (None, 0) if the file is missing, unreadable or
+            written for another version.
+    """
+    plans = {}
+    lines = 0
+    try:
+        with open(LAYOUT_PATH, "r", encoding="utf-8") as file:
+            if json.loads(file.readline() or "{}").get("version") != version:
+                logger.info("Layout cache was built for other field mappings, starting afresh.")
+                return None, 0
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash, the layout is simply planned again
+                    continue
+                # Later lines win and move the layout to the recent end
+                plans.pop(record["key"], None)
+                plans[record["key"]] = record["plan"]
+                lines += 1
+    except FileNotFoundError:
+        return None, 0
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Discarding unreadable layout cache {LAYOUT_PATH}: {e}")
+        return None, 0
+    return plans, lines
+
+
+def _load():
+    """Read the plans from disk, dropping them if the mapping file has changed since."""
+    version = _cache_version()
+    if _state["version"] == version:
+        return
+
+    plans, lines = _read_file(version)
+    _state.update({
+        "version": version,
+        "plans": plans or {},
+        "pending": {},
+        "lines": lines,
+        "rewrite": plans is None,
+    })
+
+
+def get(key):
+    """
+    Look up the extraction plan of a known layout.
+
+    Args:
+        key (str): Output of fingerprint().
+
+    Returns:
+        list or None: The stored plan, or None on a miss.
+    """
+    with _lock:
+        _load()
+        plan = _state["plans"].pop(key, None)
+        if plan is None:
+            _state["misses"] += 1
+            return None
+        # Re-insert so dict order tracks recency
+        _state["plans"][key] = plan
+        _state["hits"] += 1
+        return plan
+
+
+def put(key, plan):
+    """Remember the plan of a new layout. Call flush() to write it to disk."""
+    with _lock:
+        _load()
+        _state["plans"][key] = plan
+        _state["pending"][key] = plan
+        while len(_state["plans"]) > MAX_LAYOUTS:
+            del _state["plans"][next(iter(_state["plans"]))]
+
+
+def flush():
+    """
+    Append new plans to the journal.
+
+    The file is rewritten only when it is missing, belongs to another version, or
+    holds more than twice MAX_LAYOUTS lines; other processes' appends are kept.
+    """
+    with _lock:
+        if not _state["pending"] and not _state["rewrite"]:
+            return
+        try:
+            os.makedirs(os.path.dirname(LAYOUT_PATH), exist_ok=True)
+            if _state["rewrite"] or _state["lines"] + len(_state["pending"]) > 2 * MAX_LAYOUTS:
+                stored, _ = _read_file(_state["version"])
+                plans = {**(stored or {}), **_state["plans"]}
+                plans = dict(list(plans.items())[-MAX_LAYOUTS:])
+                lines = [json.dumps({"version": _state["version"]})]
+                lines += [json.dumps({"key": key, "plan": plan}) for key, plan in plans.items()]
+
+                with atomic_open(LAYOUT_PATH) as file:
+                    file.write("\n".join(lines) + "\n")
+                _state.update({"plans": plans, "lines": len(plans), "rewrite": False})
+            else:
+                # One write per flush, lines of concurrent writers do not interleave
+                with open(LAYOUT_PATH, "a", encoding="utf-8") as file:
+                    file.write("".join(json.dumps({"key": key, "plan": plan}) + "\n"
+                                       for key, plan in _state["pending"].items()))
+                _state["lines"] += len(_state["pending"])
+
+            logger.info(f"Layout cache saved ({len(_state['pending'])} new layouts).")
+            _state["pending"] = {}
+        except Exception as e:
+            logger.error(f"Failed to save layout cache: {e}")
+
+
+def stats():
+    """
+    Lookups served since the process started.
+
+    Returns:
+        dict: hits, misses, hit_rate and the number of known layouts.
+    """
+    with _lock:
+        lookups = _state["hits"] + _state["misses"]
+        return {
+            "hits": _state["hits"],
+            "misses": _state["misses"],
+            "hit_rate": _state["hits"] / lookups if lookups else 0.0,
+            "layouts": len(_state["plans"]),
+        }
+
+
+def clear():
+    """Forget every stored plan, in memory and on disk, and reset the counters."""
+    with _lock:
+        try:
+            os.remove(LAYOUT_PATH)
+        except FileNotFoundError:
+            pass
+        _state.update({"version": None, "plans": {}, "pending": {}, "lines": 0, "rewrite": False,
+                       "hits": 0, "misses": 0})
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from .alias_matcher import build_alias_matcher
+from .files import atomic_open
+from .fuzzy_matcher import build_fuzzy_index
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Resolved from the package, not the CWD, so it does not matter where streamlit was launched.
+# FINANCIAL_MAPPING_PATH can point at a client-specific file instead.
+MAPPING_PATH = Path(os.environ.get(
+    "FINANCIAL_MAPPING_PATH",
+    Path(__file__).resolve().parent.parent / "financial_mappings.json",
+))
+
+# Every mapping version seen is kept here so utils.reextract can diff old and new aliases
+SNAPSHOT_FOLDER = "cache/mappings/"
+
+_lock = threading.Lock()
+_registry = {
+    "signature": None,
+    "field_mappings": {},
+    "alias_lookup": {},
+    "alias_matcher": build_alias_matcher({}),
+    "fuzzy_index": build_fuzzy_index({}),
+    "version": "missing",
+}
+
+
+def create_alias_lookup(field_mappings):
+    alias_lookup = {}
+    for standard_field, aliases in field_mappings.items():
+        for alias in aliases:
+            alias_lookup[alias.strip().lower()] = standard_field
+
+    logger.info("Aliases Created!")
+    return alias_lookup
+
+
+def _file_signature():
+    """(mtime_ns, size) of the mapping file, or None if it does not exist."""
+    try:
+        stat = MAPPING_PATH.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _refresh():
+    """Reload the mapping file and rebuild the alias index if the file changed on disk."""
+    signature = _file_signature()
+    if signature == _registry["signature"]:
+        return _registry
+
+    with _lock:
+        # Another thread may have reloaded while we waited for the lock
+        if signature == _registry["signature"]:
+            return _registry
+
+        if signature is None:
+            logger.error(f"Field mapping file not found: {MAPPING_PATH}")
+            field_mappings, version = {}, "missing"
+        else:
+            try:
+                raw = MAPPING_PATH.read_bytes()
+                field_mappings = json.loads(raw)["field_mappings"]
+                version = hashlib.sha256(raw).hexdigest()[:16]
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving the last good mappings while the file is being edited
+                logger.error(f"Failed to load field mappings from {MAPPING_PATH}: {e}")
+                return _registry
+
+        if signature is not None:
+            _save_snapshot(version, field_mappings)
+
+        alias_lookup = create_alias_lookup(field_mappings)
+        _registry.update({
+            "signature": signature,
+            "field_mappings": field_mappings,
+            "alias_lookup": alias_lookup,
+            "alias_matcher": build_alias_matcher(alias_lookup),
+            "fuzzy_index": build_fuzzy_index(alias_lookup),
+            "version": version,
+        })
+        logger.info(f"Field Mappings loaded! ({len(field_mappings)} fields, version {version})")
+        return _registry
+
+
+def _save_snapshot(version, field_mappings):
+    path = os.path.join(SNAPSHOT_FOLDER, f"{version}.json")
+    if os.path.exists(path):
+        return
+    try:
+        os.makedirs(SNAPSHOT_FOLDER, exist_ok=True)
+        with atomic_open(path) as file:
+            json.dump({"field_mappings": field_mappings}, file)
+    except OSError as e:
+        logger.error(f"Failed to save mapping snapshot {version}: {e}")
+
+
+def load_snapshot(version):
+    """
+    Field mappings as they were at a given mapping version.
+
+    Returns:
+        dict or None: Standard field -> aliases, or None if that version was never seen.
+    """
+    try:
+        with open(os.path.join(SNAPSHOT_FOLDER, f"{version}.json"), "r", encoding="utf-8") as file:
+            return json.load(file)["field_mappings"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def get_field_mappings():
+    """Standard field -> list of aliases, reloaded when the mapping file changes."""
+    return _refresh()["field_mappings"]
+
+
+def get_alias_lookup():
+    """Lower-cased alias -> standard field."""
+    return _refresh()["alias_lookup"]
+
+
+def get_alias_matcher():
+    """Compiled alias matcher (see utils.alias_matcher), rebuilt only when the file changes."""
+    return _refresh()["alias_matcher"]
+
+
+def get_fuzzy_index():
+    """Trigram index for typo-tolerant matching (see utils.fuzzy_matcher), rebuilt with the matcher."""
+    return _refresh()["fuzzy_index"]
+
+
+def mapping_version():
+    """Short content hash of the loaded mapping file, 'missing' if there is none."""
+    return _refresh()["version"]
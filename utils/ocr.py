@@ -0,0 +1,274 @@
+import os
+import statistics
+import threading
+from .logs import setup_logger
+from .page_triage import pages_to_ranges, score_page
+from .values import parse_value
+
+logger = setup_logger()
+
+# Rasterization resolution; 200 dpi is enough for 8-10pt statement figures
+OCR_DPI = int(os.environ.get("OCR_DPI", "200"))
+
+# Pages sent through the recognizer at once
+OCR_BATCH_SIZE = int(os.environ.get("OCR_BATCH_SIZE", "4"))
+
+# Safety net for fully scanned annual reports: at most this many pages are read in full
+OCR_MAX_PAGES = int(os.environ.get("OCR_MAX_PAGES", "20"))
+
+# With more scanned pages than that, the top of every page is first read at a low
+# resolution and scored like a text page (statement titles sit at the top)
+OCR_PROBE_DPI = int(os.environ.get("OCR_PROBE_DPI", "100"))
+OCR_PROBE_HEIGHT = 0.35
+
+OCR_LANGUAGES = os.environ.get("OCR_LANGUAGES", "en").split(",")
+OCR_GPU = os.environ.get("OCR_GPU", "0") == "1"
+
+# Only needed on Windows or when poppler is not on PATH
+POPPLER_PATH = os.environ.get("POPPLER_PATH") or None
+
+# One reader per process (the app, or each batch worker), it holds the torch models
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    """Return this process's easyocr.Reader, loading the models on first use."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            import easyocr
+
+            _reader = easyocr.Reader(OCR_LANGUAGES, gpu=OCR_GPU)
+            logger.info(f"EasyOCR reader loaded (languages={OCR_LANGUAGES}, gpu={OCR_GPU}).")
+        return _reader
+
+
+def rasterize_pages(pdf_bytes, pages, dpi=OCR_DPI):
+    """
+    Render the given pages to images.
+
+    Args:
+        pdf_bytes (bytes): Raw bytes of the PDF.
+        pages (list of int): 1-based page numbers.
+        dpi (int): Rendering resolution.
+
+    Returns:
+        list: PIL images, in the order of pages.
+    """
+    from pdf2image import convert_from_bytes
+
+    images = []
+    # One poppler call per run of consecutive pages
+    for first_page, last_page in pages_to_ranges(pages):
+        images.extend(convert_from_bytes(pdf_bytes, dpi=dpi, first_page=first_page,
+                                         last_page=last_page, poppler_path=POPPLER_PATH))
+    return images
+
+
+def read_pages(images, batch_size=OCR_BATCH_SIZE):
+    """
+    Run the recognizer over page images in batches.
+
+    Returns:
+        list: Per page, a list of (bbox, text, confidence) detections.
+    """
+    import numpy as np
+
+    if not images:
+        return []
+
+    reader = get_reader()
+    arrays = [np.array(image.convert("RGB")) for image in images]
+
+    # Batched recognition needs one size: portrait and landscape pages go in separate batches
+    by_size = {}
+    for idx, array in enumerate(arrays):
+        by_size.setdefault(array.shape[:2], []).append(idx)
+
+    results = [None] * len(arrays)
+    with _reader_lock:
+        for (height, width), indices in by_size.items():
+            detections = reader.readtext_batched([arrays[idx] for idx in indices], n_width=width,
+                                                 n_height=height, batch_size=batch_size)
+            for idx, page_detections in zip(indices, detections):
+                results[idx] = page_detections
+    return results
+
+
+def probe_scores(pdf_bytes, pages, keywords, progress=None):
+    """
+    Score scanned pages from a quick low-resolution read of their top part.
+
+    Args:
+        pdf_bytes (bytes): Raw bytes of the PDF.
+        pages (list of int): 1-based page numbers.
+        keywords (set of str): Output of page_triage.build_keywords().
+        progress (callable, optional): progress(fraction, message) hook.
+
+    Returns:
+        dict: page -> page_triage.score_page() score of the text read.
+    """
+    import numpy as np
+
+    reader = get_reader()
+    scores = {}
+    for start in range(0, len(pages), OCR_BATCH_SIZE):
+        batch = pages[start:start + OCR_BATCH_SIZE]
+        if progress is not None:
+            progress(start / len(pages), f"Looking for statement pages {start + 1}-{start + len(batch)} of {len(pages)}")
+        for page, image in zip(batch, rasterize_pages(pdf_bytes, batch, dpi=OCR_PROBE_DPI)):
+            top = image.crop((0, 0, image.width, int(image.height * OCR_PROBE_HEIGHT)))
+            with _reader_lock:
+                text = " ".join(reader.readtext(np.array(top.convert("RGB")), detail=0))
+            scores[page] = score_page(text.lower(), keywords)
+    return scores
+
+
+def choose_pages(pages, scores, anchors=(), limit=OCR_MAX_PAGES):
+    """
+    Pick the scanned pages most likely to hold the statements.
+
+    Pages whose probe found statement keywords come first (best score first), then
+    pages by their distance to those pages and to the anchors, text pages that scored
+    in page triage. Statements continue over the next pages without a new title, so
+    neighbours of a hit rank right after the hits.
+
+    Args:
+        pages (list of int): Scanned 1-based page numbers.
+        scores (dict): page -> probe score (see probe_scores()).
+        anchors (iterable of int): Pages known to hold statement content.
+        limit (int): Number of pages to keep.
+
+    Returns:
+        list of int: The chosen pages in page order.
+    """
+    if len(pages) <= limit:
+        return sorted(pages)
+    hits = [page for page in pages if scores.get(page, 0) > 0] + list(anchors)
+
+    def rank(page):
+        distance = min((abs(page - hit) for hit in hits), default=0)
+        return -scores.get(page, 0), distance, page
+
+    return sorted(sorted(pages, key=rank)[:limit])
+
+
+def _is_amount(text):
+    return parse_value(text) is not None
+
+
+def rows_from_detections(detections):
+    """
+    Rebuild table rows from OCR bounding boxes.
+
+    Boxes are grouped into lines by their vertical centre, amount columns are found by
+    clustering the right edges of numeric boxes (figures are right aligned), and the
+    text left of the first column becomes the row label.
+
+    Args:
+        detections (list): (bbox, text, confidence) tuples, bbox as four (x, y) points.
+
+    Returns:
+        list of list of str: Rows as [label, column 1, column 2, ...], top to bottom.
+    """
+    boxes = []
+    for bbox, text, _confidence in detections:
+        text = text.strip()
+        if not text:
+            continue
+        xs = [point[0] for point in bbox]
+        ys = [point[1] for point in bbox]
+        boxes.append({"text": text, "x0": min(xs), "x1": max(xs),
+                      "yc": (min(ys) + max(ys)) / 2, "height": max(ys) - min(ys)})
+    if not boxes:
+        return []
+
+    line_height = statistics.median(box["height"] for box in boxes) or 1
+
+    # Lines: boxes whose vertical centres are within half a line of each other
+    lines = []
+    for box in sorted(boxes, key=lambda box: box["yc"]):
+        if lines and abs(box["yc"] - lines[-1]["yc"]) <= line_height * 0.5:
+            lines[-1]["boxes"].append(box)
+        else:
+            lines.append({"yc": box["yc"], "boxes": [box]})
+
+    # Amount columns: right edges of numeric boxes less than two line heights apart
+    columns = []
+    for box in sorted((box for box in boxes if _is_amount(box["text"])), key=lambda box: box["x1"]):
+        if columns and box["x1"] - columns[-1]["x1"] <= line_height * 2:
+            columns[-1]["x1"] = max(columns[-1]["x1"], box["x1"])
+            columns[-1]["x0"] = min(columns[-1]["x0"], box["x0"])
+        else:
+            columns.append({"x0": box["x0"], "x1": box["x1"]})
+
+    if not columns:
+        # No figures on the page: nothing extract_data_from_tables() could use
+        return [[" ".join(box["text"] for box in sorted(line["boxes"], key=lambda box: box["x0"]))]
+                for line in lines]
+
+    label_edge = columns[0]["x0"]
+    rows = []
+    for line in lines:
+        label_parts = []
+        cells = [""] * len(columns)
+        for box in sorted(line["boxes"], key=lambda box: box["x0"]):
+            if box["x1"] < label_edge:
+                label_parts.append(box["text"])
+                continue
+            idx = min(range(len(columns)), key=lambda i: abs(columns[i]["x1"] - box["x1"]))
+            cells[idx] = f"{cells[idx]} {box['text']}".strip()
+        rows.append([" ".join(label_parts)] + cells)
+    return rows
+
+
+def ocr_tables(pdf_bytes, pages, progress=None, keywords=None, anchors=()):
+    """
+    OCR fallback for scanned pages.
+
+    With more than OCR_MAX_PAGES pages (a fully scanned annual report), the pages to
+    read are chosen by relevance (probe_scores() and choose_pages()), not by page
+    number. Pages are rasterized and read OCR_BATCH_SIZE at a time, with a progress()
+    call before each batch, so a cancelled or timed-out job (see utils.jobs) stops
+    between batches instead of after the whole document.
+
+    Args:
+        pdf_bytes (bytes): Raw bytes of the PDF.
+        pages (list of int): Sorted 1-based pages without a text layer.
+        progress (callable, optional): progress(fraction, message) hook.
+        keywords (set of str, optional): Statement keywords for the probe (see
+            page_triage.build_keywords()); without them the pages nearest the anchors
+            are read.
+        anchors (iterable of int): Text pages that scored in page triage.
+
+    Returns:
+        list: One table (list of rows of cell text) per page that produced rows, in the
+            structure extract_data_from_tables() consumes.
+    """
+    read_progress = progress
+    if len(pages) > OCR_MAX_PAGES:
+        scores = {}
+        if keywords:
+            # The probe takes the first half of the progress bar, the full read the rest
+            probe_progress = None
+            if progress is not None:
+                probe_progress = lambda fraction, message="": progress(fraction / 2, message)
+                read_progress = lambda fraction, message="": progress(0.5 + fraction / 2, message)
+            scores = probe_scores(pdf_bytes, pages, keywords, probe_progress)
+        chosen = choose_pages(pages, scores, anchors, limit=OCR_MAX_PAGES)
+        logger.warning(f"OCR limited to {OCR_MAX_PAGES} of {len(pages)} scanned pages, chose {chosen} "
+                       f"(probe hits: {sorted(page for page, score in scores.items() if score)}).")
+        pages = chosen
+
+    logger.info(f"Running OCR fallback on pages {pages} at {OCR_DPI} dpi.")
+    tables = []
+    for start in range(0, len(pages), OCR_BATCH_SIZE):
+        batch = pages[start:start + OCR_BATCH_SIZE]
+        if read_progress is not None:
+            read_progress(start / len(pages), f"OCR of scanned pages {start + 1}-{start + len(batch)} of {len(pages)}")
+        images = rasterize_pages(pdf_bytes, batch)
+        tables.extend(rows for rows in map(rows_from_detections, read_pages(images)) if rows)
+
+    logger.info(f"OCR rebuilt {len(tables)} tables from {len(pages)} pages.")
+    return tables
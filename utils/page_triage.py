@@ -0,0 +1,165 @@
+import os
+import re
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Set PAGE_TRIAGE=0 to always send every page to Docling
+TRIAGE_ENABLED = os.environ.get("PAGE_TRIAGE", "1") == "1"
+
+# Shorter documents are converted whole, triage would not save anything
+MIN_TRIAGE_PAGES = int(os.environ.get("TRIAGE_MIN_PAGES", "6"))
+
+# Number of best scoring pages kept, and how many pages around each are added
+TOP_PAGES = int(os.environ.get("TRIAGE_TOP_PAGES", "4"))
+NEIGHBOUR_PAGES = int(os.environ.get("TRIAGE_NEIGHBOUR_PAGES", "1"))
+
+# Pages with less text than this are treated as having no text layer (scans)
+MIN_TEXT_CHARS = 20
+
+# Statement titles weigh more than a single line item
+STATEMENT_HEADINGS = [
+    "balance sheet",
+    "statement of financial position",
+    "profit and loss",
+    "profit & loss",
+    "statement of profit or loss",
+    "income statement",
+]
+HEADING_WEIGHT = 5
+
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+def build_keywords(field_mappings, required):
+    """
+    Collect the lower-cased labels that indicate a statement page.
+
+    Args:
+        field_mappings (dict): Standard field -> list of aliases.
+        required (list of str): Standard fields consumed by the extractor.
+
+    Returns:
+        set of str: Required field names plus all their aliases.
+    """
+    keywords = set()
+    for field in required:
+        keywords.add(field.strip().lower())
+        for alias in field_mappings.get(field, []):
+            alias = alias.strip().lower()
+            if len(alias) > 2:
+                keywords.add(alias)
+    return keywords
+
+
+def read_page_texts(pdf_source):
+    """
+    Read the text layer of every page.
+
+    Args:
+        pdf_source (str or bytes): PDF path or raw bytes.
+
+    Returns:
+        list of str: Lower-cased text per page, in page order.
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_source)
+    try:
+        texts = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range().lower())
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
+
+
+def score_page(text, keywords):
+    """Score one page: distinct keywords found, headings weighted, plus a year bonus."""
+    if len(text.strip()) < MIN_TEXT_CHARS:
+        return 0
+    score = sum(1 for keyword in keywords if keyword in text)
+    score += HEADING_WEIGHT * sum(1 for heading in STATEMENT_HEADINGS if heading in text)
+    # Statement pages carry fiscal year column headers
+    if YEAR_PATTERN.search(text):
+        score += 1
+    return score
+
+
+def select_pages(scores, top=TOP_PAGES, neighbours=NEIGHBOUR_PAGES):
+    """
+    Pick the best scoring pages plus their neighbours.
+
+    Args:
+        scores (list of int): Score per page, in page order.
+        top (int): Number of best pages to keep.
+        neighbours (int): Pages added on each side of a selected page.
+
+    Returns:
+        list of int: Sorted 1-based page numbers.
+    """
+    ranked = sorted((page for page, score in enumerate(scores, start=1) if score > 0),
+                    key=lambda page: (-scores[page - 1], page))
+    selected = set()
+    for page in ranked[:top]:
+        for neighbour in range(page - neighbours, page + neighbours + 1):
+            if 1 <= neighbour <= len(scores):
+                selected.add(neighbour)
+    return sorted(selected)
+
+
+def pages_to_ranges(pages):
+    """Group sorted page numbers into inclusive (start, end) runs of consecutive pages."""
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def triage_pdf(pdf_source, keywords):
+    """
+    Choose the pages worth sending through Docling's table pipeline.
+
+    Falls back to every page when triage is disabled, the document is short,
+    or no page scores (e.g. scanned statements without a text layer).
+
+    Args:
+        pdf_source (str or bytes): PDF path or raw bytes.
+        keywords (set of str): Output of build_keywords().
+
+    Returns:
+        dict: Report with page_count, selected_pages, skipped_pages, scores, reason and
+            no_text_pages (pages without a usable text layer, i.e. scanned).
+    """
+    texts = read_page_texts(pdf_source)
+    page_count = len(texts)
+    scores = [score_page(text, keywords) for text in texts]
+    all_pages = list(range(1, page_count + 1))
+
+    if not TRIAGE_ENABLED:
+        selected, reason = all_pages, "triage disabled"
+    elif page_count < MIN_TRIAGE_PAGES:
+        selected, reason = all_pages, f"short document (< {MIN_TRIAGE_PAGES} pages)"
+    elif not any(scores):
+        selected, reason = all_pages, "no statement keywords in text layer"
+    else:
+        selected, reason = select_pages(scores), "keyword score"
+
+    selected_set = set(selected)
+    report = {
+        "page_count": page_count,
+        "selected_pages": selected,
+        "skipped_pages": [page for page in all_pages if page not in selected_set],
+        "scores": scores,
+        "reason": reason,
+        "no_text_pages": [page for page, text in zip(all_pages, texts) if len(text.strip()) < MIN_TEXT_CHARS],
+    }
+    logger.info(f"Page triage ({reason}): converting pages {selected} of {page_count}, "
+                f"skipped {len(report['skipped_pages'])}.")
+    return report
@@ -0,0 +1,155 @@
+import io
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Worker processes used for page-parallel conversion (defaults to all cores)
+CONVERSION_WORKERS = max(1, int(os.environ.get("CONVERSION_WORKERS", str(os.cpu_count() or 1))))
+
+# Documents with at least this many pages are split across the workers
+PARALLEL_MIN_PAGES = int(os.environ.get("PARALLEL_MIN_PAGES", "16"))
+
+# Ranges per worker: >1 evens out pages that are slower than others (dense tables)
+RANGES_PER_WORKER = 2
+
+# One process pool per worker count, created on first use
+_executors = {}
+_executor_lock = threading.Lock()
+
+# Converter owned by each worker process, built once by _init_worker()
+_worker_converter = None
+
+
+def count_pages(pdf_source):
+    """Return the number of pages in a PDF (path or bytes) using pypdfium2 (bundled with Docling)."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_source)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def split_pages(pages, range_count):
+    """
+    Split sorted page numbers into contiguous, roughly equal ranges.
+
+    A range never spans a gap, so pages skipped by triage are never converted.
+
+    Args:
+        pages (list of int): Sorted 1-based page numbers to convert.
+        range_count (int): Number of ranges wanted.
+
+    Returns:
+        list of tuple: Inclusive, 1-based (start, end) page ranges in page order.
+    """
+    if not pages:
+        return []
+    range_count = max(1, min(range_count, len(pages)))
+    size = math.ceil(len(pages) / range_count)
+
+    ranges = []
+    length = 0
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1 and length < size:
+            ranges[-1] = (ranges[-1][0], page)
+            length += 1
+        else:
+            ranges.append((page, page))
+            length = 1
+    return ranges
+
+
+def split_page_ranges(page_count, range_count):
+    """Split pages 1..page_count into contiguous, roughly equal ranges."""
+    return split_pages(list(range(1, page_count + 1)), range_count)
+
+
+def _init_worker(threads_per_worker):
+    """Process initializer: cap intra-op threads and load one converter per worker."""
+    global _worker_converter
+    # Avoid every worker's torch runtime claiming all cores
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+
+    from .converter_pool import _build_converter
+    _worker_converter = _build_converter()
+
+
+def document_stream(pdf_bytes, file_name):
+    """Wrap PDF bytes in a Docling DocumentStream so nothing is written to disk."""
+    from docling.datamodel.base_models import DocumentStream
+
+    return DocumentStream(name=f"{file_name}.pdf", stream=io.BytesIO(pdf_bytes))
+
+
+def _convert_range(pdf_path, page_range):
+    """Convert one page range of a PDF file in a worker process and return its DoclingDocument."""
+    result = _worker_converter.convert(pdf_path, page_range=page_range)
+    return result.document
+
+
+def _get_executor(workers):
+    """
+    Return the shared process pool for this worker count, created on first use so
+    models load once per worker. A different count gets its own pool.
+    """
+    with _executor_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                # spawn: Streamlit runs threads, forking them is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads_per_worker,),
+            )
+            _executors[workers] = executor
+            logger.info(f"Started conversion process pool with {workers} worker(s).")
+        return executor
+
+
+def should_split(page_count, workers=None):
+    """Decide whether a document is long enough to be converted page-parallel."""
+    workers = CONVERSION_WORKERS if workers is None else workers
+    return workers > 1 and page_count >= PARALLEL_MIN_PAGES
+
+
+def convert_pdf_parallel(pdf_bytes, file_name, pages=None, workers=None):
+    """
+    Convert a PDF by splitting it into page ranges converted in a process pool.
+
+    The PDF is written once to a temporary file that the workers read, instead of
+    pickling the bytes to the pool for every page range.
+
+    Args:
+        pdf_bytes (bytes): Raw bytes of the PDF.
+        file_name (str): Name reported to Docling for the in-memory stream.
+        pages (list of int, optional): Sorted 1-based pages to convert, defaults to all.
+        workers (int, optional): Worker processes, defaults to CONVERSION_WORKERS.
+
+    Returns:
+        list: One DoclingDocument per page range, in page order.
+    """
+    workers = CONVERSION_WORKERS if workers is None else max(1, workers)
+    if pages is None:
+        pages = list(range(1, count_pages(pdf_bytes) + 1))
+    page_ranges = split_pages(pages, workers * RANGES_PER_WORKER)
+
+    logger.info(f"Converting {len(pages)} pages in {len(page_ranges)} ranges on {workers} worker(s).")
+
+    executor = _get_executor(workers)
+    with tempfile.TemporaryDirectory(prefix="conversion-") as folder:
+        # Docling names the document after the file, as it does for the in-memory stream
+        pdf_path = os.path.join(folder, f"{os.path.basename(file_name) or 'document'}.pdf")
+        with open(pdf_path, "wb") as file:
+            file.write(pdf_bytes)
+        # map() yields results in submission order, i.e. page order
+        return list(executor.map(_convert_range, [pdf_path] * len(page_ranges), page_ranges))
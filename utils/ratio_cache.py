@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from . import calculate as calc
+from .logs import setup_logger
+from .mappings import mapping_version
+
+logger = setup_logger()
+
+# Periods remembered per session, least recently used are dropped first
+MAX_CACHED_PERIODS = int(os.environ.get("RATIO_CACHE_SIZE", "64"))
+
+
+def new_cache():
+    """An empty per-session cache (keep it in st.session_state)."""
+    return OrderedDict()
+
+
+def period_key(data, principal_repayment=0, scale=1):
+    """
+    Stable hash of everything a period's ratios depend on.
+
+    Args:
+        data (dict): The period's {field or alias: value} data.
+        principal_repayment (float): Principal repayment in rupees.
+        scale (float): Rupees per statement unit.
+
+    Returns:
+        str: SHA-256 hex digest, equal for equal inputs whatever the key order. The
+            mapping version is included, an edited mapping file resolves fields anew.
+    """
+    payload = json.dumps([mapping_version(), float(principal_repayment), float(scale), data],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_ratios(cache, data, principal_repayment=0, scale=1, max_entries=MAX_CACHED_PERIODS):
+    """
+    calculate_ratios_for_data(), remembered per period.
+
+    Args:
+        cache (OrderedDict): Output of new_cache(), period key -> ratios.
+        data, principal_repayment, scale: As for calculate_ratios_for_data().
+        max_entries (int): Periods kept in the cache.
+
+    Returns:
+        tuple: (ratios, hit). The ratios are a copy, callers may change them freely.
+    """
+    key = period_key(data, principal_repayment, scale)
+    ratios = cache.get(key)
+    hit = ratios is not None
+    if hit:
+        cache.move_to_end(key)
+    else:
+        ratios = calc.calculate_ratios_for_data(data, principal_repayment, scale)
+        cache[key] = ratios
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+    return {ratio_name: dict(ratio) for ratio_name, ratio in ratios.items()}, hit
+
+
+def get_years_ratios(cache, all_years_data, repayment_values, scale=1):
+    """
+    Ratios of every period, recalculating only periods whose inputs changed.
+
+    Args:
+        cache (OrderedDict): Output of new_cache().
+        all_years_data (dict): Year key -> period data.
+        repayment_values (dict): Year key -> principal repayment in rupees (0 if absent).
+        scale (float): Rupees per statement unit.
+
+    Returns:
+        dict: Year key -> ratios, as proceeding_steps() expects.
+    """
+    years_ratios = {}
+    calculated = []
+    for year_key, data in all_years_data.items():
+        years_ratios[year_key], hit = get_ratios(cache, data, repayment_values.get(year_key, 0), scale)
+        if not hit:
+            calculated.append(year_key)
+
+    logger.info(f"Ratio cache: {len(years_ratios) - len(calculated)} of {len(years_ratios)} periods cached, "
+                f"calculated {calculated or 'none'} ({len(cache)} cached in this session).")
+    return years_ratios
@@ -0,0 +1,220 @@
+"""
+Re-apply an edited financial_mappings.json to documents that were already converted.
+
+Usage (from the repository root):
+    python -m utils.reextract -o temp/reextracted -w 4
+
+Only the label matching and value parsing stages run again, on the tables kept in the
+conversion cache, so Docling is not paid for twice. Cache entries made under an older
+mapping version are compared with the current file: documents with a table label that
+contains an added, removed or remapped alias, or that no alias matches but is close
+enough to one of them for fuzzy matching, are re-extracted in parallel, the others are
+only re-keyed to the new version. Every re-extracted document gets an updated
+<name>.json in the output folder, and diff.json lists the fields whose values changed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from . import conversion_cache
+from .alias_matcher import build_alias_matcher, match_label
+from .fuzzy_matcher import FUZZY_ENABLED, build_fuzzy_index, fuzzy_match
+from .logs import setup_logger
+from .mappings import create_alias_lookup, get_alias_lookup, get_alias_matcher, load_snapshot, mapping_version
+
+logger = setup_logger()
+
+DEFAULT_OUTPUT = "temp/reextracted/"
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+
+
+def changed_aliases(old_lookup, new_lookup):
+    """Aliases added, removed or pointed at another standard field."""
+    return {alias for alias in old_lookup.keys() | new_lookup.keys()
+            if old_lookup.get(alias) != new_lookup.get(alias)}
+
+
+def is_affected(tables, changed_matcher, changed_fuzzy_index=None, alias_matcher=None):
+    """
+    True if any row label contains one of the changed aliases, or, with a fuzzy index,
+    if a label no current alias matches is fuzzily close to one of them.
+
+    Args:
+        tables (list): Cached tables of the document.
+        changed_matcher: Alias matcher over the changed aliases.
+        changed_fuzzy_index (dict, optional): Fuzzy index over the changed aliases.
+        alias_matcher (optional): Alias matcher over the current mapping file.
+    """
+    for table in tables:
+        for row in table:
+            if not row:
+                continue
+            label = row[0].strip().lower()
+            if match_label(changed_matcher, label):
+                return True
+            # Labels the old matcher matched and the current one does not were caught above
+            if (changed_fuzzy_index is not None and not match_label(alias_matcher, label)
+                    and fuzzy_match(changed_fuzzy_index, label)):
+                return True
+    return False
+
+
+def field_diff(old_data, new_data):
+    """
+    Compare two extractions.
+
+    Returns:
+        dict: period -> {field: {"old": value, "new": value}} for every field that was
+            added, dropped or changed. None stands for a missing value.
+    """
+    diff = {}
+    for period in sorted(old_data.keys() | new_data.keys()):
+        before, after = old_data.get(period, {}), new_data.get(period, {})
+        changes = {field: {"old": before.get(field), "new": after.get(field)}
+                   for field in sorted(before.keys() | after.keys())
+                   if before.get(field) != after.get(field)}
+        if changes:
+            diff[period] = changes
+    return diff
+
+
+def stale_entries():
+    """
+    The latest cache entry of every document that was extracted with other mappings.
+
+    Entries from another converter version are left alone, their tables are not what
+    the current converter would produce.
+
+    Returns:
+        list: (key, entry) tuples.
+    """
+    version = mapping_version()
+    converter = conversion_cache.converter_version()
+    latest = {}
+    current = set()
+    for key, entry in conversion_cache.iter_entries():
+        if entry.get("converter_version") != converter:
+            continue
+        # Entries cached before pdf_sha256 was recorded are identified by their key
+        document = entry.get("pdf_sha256") or key
+        if entry.get("mapping_version") == version:
+            current.add(document)
+        elif document not in latest or entry.get("created", 0) > latest[document][1].get("created", 0):
+            latest[document] = (key, entry)
+    return [latest[document] for document in sorted(latest) if document not in current]
+
+
+def _reextract(tables):
+    from . import doc_converter
+
+    return doc_converter.extract_data_from_tables(tables)
+
+
+def _store(entry, data):
+    """Cache the result under the current mapping version, when the PDF digest is known."""
+    if entry.get("pdf_sha256") and data:
+        conversion_cache.put(conversion_cache.make_key_for_digest(entry["pdf_sha256"]), entry["tables"], data,
+                             triage=entry.get("triage"), pdf_sha256=entry["pdf_sha256"],
+                             file_name=entry.get("file_name"), unit=entry.get("unit", "Rupees"))
+
+
+def _document_name(key, entry):
+    return f"{entry.get('file_name') or 'document'}_{(entry.get('pdf_sha256') or key)[:8]}"
+
+
+def run(output_dir=DEFAULT_OUTPUT, workers=DEFAULT_WORKERS, force=False):
+    """
+    Re-extract the cached documents affected by the current mapping changes.
+
+    Args:
+        output_dir (str): Folder for the updated JSON files and diff.json.
+        workers (int): Worker processes for the re-extraction.
+        force (bool): Re-extract every stale document, not only the affected ones.
+
+    Returns:
+        dict: Summary with stale, reextracted, rekeyed, changed and seconds.
+    """
+    start = time.perf_counter()
+    version = mapping_version()
+    new_lookup = get_alias_lookup()
+    alias_matcher = get_alias_matcher()
+
+    # One matcher (and fuzzy index) over the changed aliases per old mapping version
+    changed_matchers = {}
+    affected, rekeyed = [], 0
+    stale = stale_entries()
+    for key, entry in stale:
+        old_version = entry.get("mapping_version")
+        if old_version not in changed_matchers:
+            snapshot = load_snapshot(old_version)
+            if snapshot is None:
+                logger.warning(f"No snapshot of mapping version {old_version}, its documents are all re-extracted.")
+                changed_matchers[old_version] = None
+            else:
+                changed = changed_aliases(create_alias_lookup(snapshot), new_lookup)
+                logger.info(f"Mapping version {old_version} -> {version}: {len(changed)} aliases changed.")
+                # One field for all, a label close to two changed aliases is not ambiguous here
+                fuzzy_index = build_fuzzy_index(dict.fromkeys(changed, "changed")) if FUZZY_ENABLED else None
+                changed_matchers[old_version] = (build_alias_matcher({alias: alias for alias in changed}),
+                                                 fuzzy_index)
+
+        matchers = changed_matchers[old_version]
+        if force or matchers is None or is_affected(entry["tables"], *matchers, alias_matcher):
+            affected.append((key, entry))
+        else:
+            _store(entry, entry["data"])
+            rekeyed += 1
+
+    print(f"{len(stale)} documents extracted with older mappings: {len(affected)} affected, {rekeyed} re-keyed.")
+
+    report = {}
+    if affected:
+        os.makedirs(output_dir, exist_ok=True)
+        tables = [entry["tables"] for _, entry in affected]
+        if workers > 1 and len(affected) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(affected)),
+                                     mp_context=multiprocessing.get_context("spawn")) as executor:
+                results = list(executor.map(_reextract, tables))
+        else:
+            results = [_reextract(table) for table in tables]
+
+        for (key, entry), data in zip(affected, results):
+            name = _document_name(key, entry)
+            diff = field_diff(entry.get("data") or {}, data)
+            report[name] = {
+                "mapping_version": {"old": entry.get("mapping_version"), "new": version},
+                "changes": diff,
+            }
+            with open(os.path.join(output_dir, f"{name}.json"), "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=4)
+            _store(entry, data)
+            print(f"{'changed' if diff else 'same':<8} {name}")
+
+        with open(os.path.join(output_dir, "diff.json"), "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=4)
+
+    summary = {
+        "stale": len(stale),
+        "reextracted": len(affected),
+        "rekeyed": rekeyed,
+        "changed": sum(1 for item in report.values() if item["changes"]),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    logger.info(f"Re-extraction summary: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="Folder for updated JSON and diff.json")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes")
+    parser.add_argument("--all", action="store_true", help="Re-extract every stale document, affected or not")
+    args = parser.parse_args(argv)
+
+    run(args.output, workers=max(1, args.workers), force=args.all)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Headless portfolio scoring: ratios, statuses and the GREEN/AMBER/RED decision for every
+customer in a JSONL file, one output line per non-blank input line, in input order.
+
+Usage (from the repository root):
+    python -m utils.scoring customers.jsonl -o scores.jsonl -w 4
+
+Each input line is a customer:
+    {"id": "C-001",
+     "periods": {"audited-2023": {"Total Current Assets": 1200, ...}, "projected-2024": {...}},
+     "repayment": {"audited-2023": 500000, "projected-2024": 500000},
+     "unit": "Thousands ('000)"}
+
+"data" is accepted in place of "periods", so records written by utils.batch_ingest can
+be scored as they are. "repayment" is in rupees, per period or one number for every
+period (default 0). The statement unit comes from "unit" or "scale" (default rupees).
+
+The input is read in chunks of --chunk-size lines and at most two chunks per worker
+are in flight, so memory stays bounded however large the book is.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+import numpy as np
+from .batch_ratios import calculate_ratio_arrays
+from .decision import AMBER, GREEN, RED, count_green, decide, decision_years
+from .general import get_statuses, resolve_fields
+from .logs import setup_logger
+from .mappings import get_field_mappings
+from .units import SCALES
+
+logger = setup_logger()
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _json_value(value):
+    """NaN (division by zero) has no JSON form, write it as null."""
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _customer_inputs(customer):
+    """(periods, repayment per period, scale) of one input record, raising ValueError if malformed."""
+    periods = customer.get("periods", customer.get("data"))
+    if not isinstance(periods, dict) or not periods:
+        raise ValueError("no periods")
+
+    if "scale" in customer:
+        scale = float(customer["scale"])
+    else:
+        unit = customer.get("unit", "Rupees")
+        if unit not in SCALES:
+            raise ValueError(f"unknown unit {unit!r}")
+        scale = SCALES[unit]
+
+    repayment = customer.get("repayment", 0) or 0
+    if isinstance(repayment, dict):
+        repayments = {year: float(repayment.get(year, 0) or 0) for year in periods}
+    else:
+        repayments = dict.fromkeys(periods, float(repayment))
+    return periods, repayments, scale
+
+
+def score_customers(customers):
+    """
+    Score a batch of customers.
+
+    All their periods go through the batch ratio engine in one call; statuses and the
+    decision rule are the ones the app applies.
+
+    Args:
+        customers (list of dict): Input records (see the module docstring).
+
+    Returns:
+        list of dict: Per customer id, status ("ok" or "error"), count_green and decision
+            for each decision year, and the ratios of every period (value, status, color).
+    """
+    field_mappings = get_field_mappings()
+    results = []
+    rows, repayments, scales, owners = [], [], [], []
+    for customer in customers:
+        result = {"id": customer.get("id", customer.get("file")), "status": "ok"}
+        results.append(result)
+        try:
+            periods, repayment, scale = _customer_inputs(customer)
+            # Resolve every period before queueing any, so a bad one only fails its customer
+            values = {year: [float(value) for value in resolve_fields(data, field_mappings).values]
+                      for year, data in periods.items()}
+        except (AttributeError, TypeError, ValueError) as e:
+            result.update({"status": "error", "error": str(e)})
+            continue
+
+        result["years"] = {}
+        for year, row in values.items():
+            rows.append(row)
+            repayments.append(repayment[year])
+            scales.append(scale)
+            owners.append((result, year))
+
+    if rows:
+        arrays = calculate_ratio_arrays(np.array(rows, dtype=float), list(field_mappings),
+                                        np.array(repayments), np.array(scales))
+        statuses = {ratio_name: get_statuses(ratio_name, values) for ratio_name, values in arrays.items()}
+        for i, (result, year) in enumerate(owners):
+            result["years"][year] = {
+                ratio_name: {"value": values[i], "status": statuses[ratio_name][0][i],
+                             "color": statuses[ratio_name][2][i]}
+                for ratio_name, values in arrays.items()
+            }
+
+    for result in results:
+        if result["status"] != "ok":
+            continue
+        result["decisions"] = {}
+        for year in decision_years(result["years"]):
+            if year is not None:
+                ratios = result["years"][year]
+                result["decisions"][year] = {"count_green": count_green(ratios), "decision": decide(ratios)}
+        for ratios in result["years"].values():
+            for ratio in ratios.values():
+                ratio["value"] = _json_value(ratio["value"])
+    return results
+
+
+def score_lines(lines):
+    """
+    Score a chunk of JSONL lines in a worker.
+
+    Returns:
+        tuple: (one JSON line per input line in input order, errors included;
+            counts of customers, failures and decisions for the run summary).
+    """
+    customers, errors = [], {}
+    for i, line in enumerate(lines):
+        try:
+            customer = json.loads(line)
+            if not isinstance(customer, dict):
+                raise ValueError("not a JSON object")
+            customers.append(customer)
+        except ValueError as e:
+            errors[i] = {"id": None, "status": "error", "error": f"invalid JSON: {e}"}
+
+    scored = iter(score_customers(customers))
+    results = [errors[i] if i in errors else next(scored) for i in range(len(lines))]
+
+    counts = dict.fromkeys(("customers", "failed", GREEN, AMBER, RED, "undecided"), 0)
+    for result in results:
+        counts["customers"] += 1
+        if result["status"] != "ok":
+            counts["failed"] += 1
+            continue
+        for decision in result["decisions"].values():
+            counts[decision["decision"] or "undecided"] += 1
+    return [json.dumps(result) for result in results], counts
+
+
+def _chunks(file, chunk_size):
+    """Lists of up to chunk_size non-blank lines."""
+    lines = (line for line in file if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(input_path, output_path, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Score every customer of input_path and write the results to output_path.
+
+    Inputs of a single chunk are scored in this process; larger ones are spread over
+    worker processes.
+
+    Returns:
+        dict: Summary with customers, failed, decision counts, seconds and customers_per_second.
+    """
+    start = time.perf_counter()
+    summary = dict.fromkeys(("customers", "failed", GREEN, AMBER, RED, "undecided"), 0)
+
+    def write(output, scored):
+        lines, counts = scored
+        output.write("".join(line + "\n" for line in lines))
+        for key, count in counts.items():
+            summary[key] += count
+
+    with open(input_path, "r", encoding="utf-8") as file, open(output_path, "w", encoding="utf-8") as output:
+        chunks = _chunks(file, chunk_size)
+        head = list(islice(chunks, 2))
+
+        if len(head) < 2 or workers <= 1:
+            for chunk in chain(head, chunks):
+                write(output, score_lines(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as executor:
+                in_flight = deque()
+                for chunk in chain(head, chunks):
+                    # Write finished chunks in order before reading more of the input
+                    while len(in_flight) >= 2 * workers:
+                        write(output, in_flight.popleft().result())
+                    in_flight.append(executor.submit(score_lines, chunk))
+                while in_flight:
+                    write(output, in_flight.popleft().result())
+
+    seconds = time.perf_counter() - start
+    summary["seconds"] = round(seconds, 2)
+    summary["customers_per_second"] = round(summary["customers"] / seconds, 1) if seconds else 0.0
+    print(f"Scored {summary['customers']} customers ({summary['failed']} failed) in {seconds:.1f}s: "
+          f"{summary[GREEN]} GREEN, {summary[AMBER]} AMBER, {summary[RED]} RED, "
+          f"{summary['undecided']} undecided decision years.")
+    logger.info(f"Portfolio scoring summary: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file with one customer per line")
+    parser.add_argument("-o", "--output", default="scores.jsonl", help="JSONL file to write the scores to")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Customers per chunk")
+    args = parser.parse_args(argv)
+
+    run(args.input, args.output, workers=max(1, args.workers), chunk_size=max(1, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import re
+from collections import Counter
+from .logs import setup_logger
+
+logger = setup_logger()
+
+# Unit name -> multiplier to rupees
+SCALES = {
+    "Rupees": 1,
+    "Thousands ('000)": 1_000,
+    "Lakhs": 100_000,
+    "Millions": 1_000_000,
+    "Crores": 10_000_000,
+}
+
+# Written-out units only count next to a currency or "in"/"amount" wording, so a note
+# such as "a loan of 5 crore" is not taken for the statement unit
+UNIT_CONTEXT = re.compile(r"(?i)\b(?:in|rs|npr|inr|amount|amounts|figures)\b|रु")
+UNIT_PATTERNS = [
+    (re.compile(r"(?i)\bcrores?\b"), "Crores", True),
+    (re.compile(r"(?i)\b(?:lakhs?|lacs?)\b"), "Lakhs", True),
+    (re.compile(r"(?i)\b(?:millions?|mn)\b"), "Millions", True),
+    (re.compile(r"(?i)\bthousands?\b"), "Thousands ('000)", True),
+    # '000, ’000, (000), 000s: unambiguous on their own
+    (re.compile(r"['’‘`]\s?000\b|\(\s?000\s?\)|\b000s\b"), "Thousands ('000)", False),
+    # A bare 000 next to a currency word: (Rs. 000), NPR in 000, 000 Rs. (not Rs. 1,000)
+    (re.compile(r"(?i)(?:\b(?:rs|npr|inr)\b|रु)\.?\s*(?:in\s+)?000(?![\d,.])|(?<![\d,.])000\s*(?:\b(?:rs|npr|inr)\b|रु)"),
+     "Thousands ('000)", False),
+]
+
+# Only short headings and header cells are considered, not running text
+MAX_UNIT_TEXT = 120
+
+
+class ScaledData(dict):
+    """
+    Extracted period -> {field: value} data that remembers the unit it is stated in.
+
+    Values stay as printed in the statement; scale is applied where it matters
+    (EBITDA and the repayment used in DSCR, see utils.calculate).
+    """
+
+    def __init__(self, data=(), scale=1, unit="Rupees"):
+        super().__init__(data)
+        self.scale = scale
+        self.unit = unit
+
+
+def detect_unit(texts):
+    """
+    Detect the unit a statement is stated in, e.g. "Rs. in '000" or "NPR in lakhs".
+
+    Args:
+        texts (iterable of str): Header cells and headings of the document.
+
+    Returns:
+        str: Key of SCALES, "Rupees" when no unit is stated.
+    """
+    votes = Counter()
+    for text in texts:
+        if not text or len(text) > MAX_UNIT_TEXT:
+            continue
+        for pattern, unit, needs_context in UNIT_PATTERNS:
+            if pattern.search(text) and (not needs_context or UNIT_CONTEXT.search(text)):
+                votes[unit] += 1
+                break
+
+    if not votes:
+        return "Rupees"
+
+    unit, count = votes.most_common(1)[0]
+    logger.info(f"Statement unit detected: {unit} ({count} of {sum(votes.values())} mentions).")
+    return unit
+
+
+def table_header_texts(tables, header_rows=3):
+    """Cells of the first rows of every table, where the unit is usually stated."""
+    for table in tables:
+        for row in table[:header_rows]:
+            yield from row
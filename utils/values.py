@@ -0,0 +1,65 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Unicode minus and dashes that statements use for negatives or nil amounts
+MINUS_SIGNS = {"−": "-", "‒": "-", "–": "-", "—": "-", "―": "-", "﹣": "-", "－": "-"}
+
+# Devanagari digits, as printed in some Nepali statements
+NEPALI_DIGITS = {chr(0x0966 + digit): str(digit) for digit in range(10)}
+
+# One C-level pass per cell: normalise minus signs and digits, turn "(" into a leading
+# minus for bracket negatives, and drop grouping separators (Western 1,234,567 and
+# Indian/Nepali 12,34,567 alike), spaces and currency symbols
+CELL_TRANSLATION = str.maketrans({
+    **MINUS_SIGNS,
+    **NEPALI_DIGITS,
+    "(": "-",
+    ")": None,
+    ",": None,
+    " ": None,
+    " ": None,
+    "\t": None,
+    "$": None,
+    "₹": None,
+})
+
+# Currency words left after translation: Rs./Rs, NPR, INR, रु
+CURRENCY_PATTERN = re.compile(r"(?i)रु\.?|(?:rs|npr|inr)\.?")
+
+
+def parse_values(cells):
+    """
+    Convert a column of statement cells to floats in one batch.
+
+    Handles bracket negatives, currency symbols ($, Rs., NPR), any digit grouping,
+    dash-as-zero, unicode minus and Devanagari digits.
+
+    Args:
+        cells (list of str): Raw cell text.
+
+    Returns:
+        tuple: (values, unparsed) numpy arrays. values is float64 with NaN where a
+            cell could not be parsed, unparsed is the boolean mask of those cells.
+    """
+    text = [cell.translate(CELL_TRANSLATION) if isinstance(cell, str) else "" for cell in cells]
+    # Currency words are prefixes, only cells starting with a letter need the regex
+    text = [CURRENCY_PATTERN.sub("", cell, count=1) if cell[:1].isalpha() else cell for cell in text]
+    # A cell holding only dashes means nil
+    text = ["0" if cell and not cell.strip("-") else cell for cell in text]
+
+    try:
+        # Fast path: the whole column converts in one numpy call
+        values = np.array(text, dtype=float)
+    except ValueError:
+        values = pd.to_numeric(pd.Series(text, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+    unparsed = ~np.isfinite(values)
+    values = np.where(unparsed, np.nan, values)
+    return values, unparsed
+
+
+def parse_value(cell):
+    """Parse a single cell, returning None when it is not a number."""
+    values, unparsed = parse_values([cell])
+    return None if unparsed[0] else float(values[0])
@@ -0,0 +1,152 @@
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from .logs import setup_logger
+
+logger = setup_logger()
+
+WORKSPACE_FOLDER = "temp/jobs/"
+
+# Upper bound on the total size of all job folders (bytes)
+MAX_WORKSPACE_BYTES = int(os.environ.get("WORKSPACE_MAX_MB", "512")) * 1024 * 1024
+
+# Job folders older than this are removed regardless of the quota (seconds)
+MAX_WORKSPACE_AGE = float(os.environ.get("WORKSPACE_MAX_AGE_HOURS", "72")) * 3600
+
+# Half-written folders live under this prefix until the job succeeds
+STAGING_PREFIX = ".staging-"
+
+_lock = threading.Lock()
+
+
+def _safe_name(file_name):
+    """Upload names end up in paths: keep letters, digits, dot, dash and underscore."""
+    return re.sub(r"[^\w.-]+", "_", file_name).strip("._")[:60] or "document"
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+@contextmanager
+def job_workspace(file_name):
+    """
+    Give one job its own folder under temp/jobs/.
+
+    Files are written to a staging folder that only becomes the job folder when the
+    block completes; on an exception it is removed, so no half-written job is left.
+    The quota is enforced after every job.
+
+    Args:
+        file_name (str): Upload name, kept in the folder name for people browsing temp/.
+
+    Yields:
+        str: Folder to write the job's artifacts to.
+    """
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{_safe_name(file_name)}-{uuid.uuid4().hex[:8]}"
+    staging = os.path.join(WORKSPACE_FOLDER, f"{STAGING_PREFIX}{job_id}")
+    os.makedirs(staging)
+    try:
+        yield staging
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        logger.warning(f"Job workspace {job_id} discarded after a failure.")
+        raise
+
+    final = os.path.join(WORKSPACE_FOLDER, job_id)
+    os.replace(staging, final)
+    logger.info(f"Job workspace saved: {final}")
+    evict()
+
+
+def usage():
+    """
+    Size of the finished job folders.
+
+    Returns:
+        list: (last used time, size in bytes, path) per job folder, oldest first.
+    """
+    if not os.path.isdir(WORKSPACE_FOLDER):
+        return []
+
+    jobs = []
+    for name in os.listdir(WORKSPACE_FOLDER):
+        path = os.path.join(WORKSPACE_FOLDER, name)
+        if name.startswith(STAGING_PREFIX) or not os.path.isdir(path):
+            continue
+        try:
+            jobs.append((os.stat(path).st_mtime, _dir_size(path), path))
+        except OSError:
+            continue
+    return sorted(jobs)
+
+
+def touch(path):
+    """
+    Mark a job folder as recently used so eviction keeps it longer.
+
+    Paths outside WORKSPACE_FOLDER (e.g. the legacy temp/ folder) are left alone.
+    """
+    root = os.path.abspath(WORKSPACE_FOLDER)
+    path = os.path.abspath(path)
+    if os.path.dirname(path) != root or os.path.basename(path).startswith(STAGING_PREFIX):
+        return
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def evict(max_bytes=None, max_age=None):
+    """
+    Remove job folders older than max_age, then least recently used ones until the
+    rest fits in max_bytes.
+
+    Args:
+        max_bytes (int, optional): Quota, defaults to MAX_WORKSPACE_BYTES.
+        max_age (float, optional): Age limit in seconds, defaults to MAX_WORKSPACE_AGE.
+
+    Returns:
+        int: Number of job folders removed.
+    """
+    max_bytes = MAX_WORKSPACE_BYTES if max_bytes is None else max_bytes
+    max_age = MAX_WORKSPACE_AGE if max_age is None else max_age
+
+    with _lock:
+        jobs = usage()
+        total = sum(size for _, size, _ in jobs)
+        oldest_allowed = time.time() - max_age
+
+        removed = 0
+        for used, size, path in jobs:
+            if used >= oldest_allowed and total <= max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            if not os.path.exists(path):
+                total -= size
+                removed += 1
+
+        # Staging folders of crashed processes: nothing will ever finish them
+        if os.path.isdir(WORKSPACE_FOLDER):
+            for name in os.listdir(WORKSPACE_FOLDER):
+                path = os.path.join(WORKSPACE_FOLDER, name)
+                try:
+                    if name.startswith(STAGING_PREFIX) and os.stat(path).st_mtime < oldest_allowed:
+                        shutil.rmtree(path, ignore_errors=True)
+                except OSError:
+                    continue
+
+    if removed:
+        logger.info(f"Evicted {removed} job workspaces ({total} bytes remain).")
+    return removed